@@ -1,6 +1,7 @@
 from app.db.base import Base
 from app.models.user import User
 from app.models.project import Project
+from app.models.actor import Actor
 
 # This list is exposed to alembic/env.py
-__all__ = ["Base", "User", "Project"]
\ No newline at end of file
+__all__ = ["Base", "User", "Project", "Actor"]
\ No newline at end of file
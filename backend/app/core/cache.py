@@ -1,39 +1,387 @@
+import asyncio
 import json
+import time
+import zlib
+from collections import OrderedDict
 from typing import Optional, Any
 import redis.asyncio as redis
 from app.core.config import settings  # <--- Import settings
 
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is the fallback
+    orjson = None
+
+# One-byte format markers. None can start a JSON document, so values written
+# as plain JSON text by older releases still decode.
+_RAW = b"J"
+_ZLIB = b"Z"
+_BYTES = b"B"  # bytes values are stored as-is, e.g. pre-serialized responses
+_ZBYTES = b"C"
+
+
+def encode_value(value: Any, compress_threshold: int) -> bytes:
+    if isinstance(value, bytes):
+        body, plain, packed_marker = value, _BYTES, _ZBYTES
+    else:
+        body = orjson.dumps(value) if orjson else json.dumps(value).encode()
+        plain, packed_marker = _RAW, _ZLIB
+    if compress_threshold and len(body) >= compress_threshold:
+        packed = zlib.compress(body, 1)
+        if len(packed) < len(body):
+            return packed_marker + packed
+    return plain + body
+
+
+def decode_value(data) -> Any:
+    if isinstance(data, str):
+        data = data.encode()
+    marker, body = data[:1], data[1:]
+    if marker in (_ZLIB, _ZBYTES):
+        body = zlib.decompress(body)
+    elif marker not in (_RAW, _BYTES):
+        body = data  # Legacy plain JSON
+    if marker in (_BYTES, _ZBYTES):
+        return body
+    return orjson.loads(body) if orjson else json.loads(body)
+
+
+class LocalLRU:
+    """
+    In-process LRU of encoded values with per-entry TTL, bounded by entry count
+    and total bytes. Values stay encoded so every reader decodes a fresh copy.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def set(self, key: str, data: bytes, ttl: float):
+        if self.max_items <= 0 or len(data) > self.max_bytes:
+            return
+        self.delete(key)
+        self._entries[key] = (time.monotonic() + ttl, data)
+        self.size_bytes += len(data)
+        while len(self._entries) > self.max_items or self.size_bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size_bytes -= len(evicted)
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry[1])
+
+    def clear(self):
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheStats:
+    """
+    Hit/miss/latency counters per key namespace (the part before the first ':').
+    """
+
+    def __init__(self):
+        self.namespaces = {}
+
+    def _ns(self, key: str):
+        name = key.split(":", 1)[0]
+        ns = self.namespaces.get(name)
+        if ns is None:
+            ns = self.namespaces[name] = {
+                "l1_hits": 0, "l2_hits": 0, "misses": 0, "sets": 0, "errors": 0, "skipped": 0,
+                "l2_calls": 0, "l2_seconds": 0.0,
+            }
+        return ns
+
+    def record(self, key: str, outcome: str):
+        self._ns(key)[outcome] += 1
+
+    def record_latency(self, keys, seconds: float):
+        # A batched round trip is attributed evenly to the namespaces it served
+        share = seconds / max(len(keys), 1)
+        for key in keys:
+            ns = self._ns(key)
+            ns["l2_calls"] += 1
+            ns["l2_seconds"] += share
+
+    def snapshot(self):
+        out = {}
+        for name, ns in self.namespaces.items():
+            lookups = ns["l1_hits"] + ns["l2_hits"] + ns["misses"]
+            out[name] = {
+                **ns,
+                "hit_ratio": (ns["l1_hits"] + ns["l2_hits"]) / lookups if lookups else 0.0,
+                "l2_avg_ms": ns["l2_seconds"] / ns["l2_calls"] * 1000 if ns["l2_calls"] else 0.0,
+            }
+        return out
+
+
+class CircuitBreaker:
+    """
+    Stops calling Redis after `failure_threshold` consecutive failures. While
+    open, callers skip Redis instantly (a cache miss / no-op) and a background
+    task pings it every `probe_interval` seconds until it answers again.
+    """
+
+    def __init__(self, failure_threshold: int, probe_interval: float, probe):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.probe_interval = probe_interval
+        self._probe = probe
+        self._probe_task: Optional[asyncio.Task] = None
+        self.state = "closed"
+        self.failures = 0
+        self.trips = 0
+        self.opened_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        return self.state == "closed"
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "closed" and self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.trips += 1
+            self.opened_at = time.time()
+            print(f"🔌 Redis circuit open after {self.failures} failures, serving without cache")
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self):
+        while self.state == "open":
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await asyncio.wait_for(self._probe(), timeout=self.probe_interval)
+            except Exception:
+                continue
+            self.state = "closed"
+            self.failures = 0
+            self.opened_at = None
+            print("✅ Redis reachable again, circuit closed")
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "open_for_s": time.time() - self.opened_at if self.opened_at else 0.0,
+        }
+
+    async def close(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+
 class CacheService:
     def __init__(self):
         # FIX: Use the variable from settings/env instead of hardcoded string
-        self.redis_url = settings.REDIS_URL 
-        
+        self.redis_url = settings.REDIS_URL
+        self.compress_threshold = settings.CACHE_COMPRESS_THRESHOLD
+        self.l1_ttl = settings.CACHE_L1_TTL
+        self.local = LocalLRU(settings.CACHE_L1_MAX_ITEMS, settings.CACHE_L1_MAX_BYTES)
+        self.stats = CacheStats()
+
         # Add error handling for connection
         try:
+            # Binary responses: cache values are encoded bytes. Other users of
+            # this connection (jobs, progress) decode what they read themselves.
             self.redis = redis.from_url(
-                self.redis_url, 
-                encoding="utf-8", 
-                decode_responses=True,
-                socket_connect_timeout=5  # Fail fast if connection is bad
+                self.redis_url,
+                decode_responses=False,
+                socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,  # Fail fast if connection is bad
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT
             )
         except Exception as e:
             print(f"❌ Redis Connection Error: {e}")
 
-    async def get(self, key: str) -> Optional[Any]:
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.REDIS_BREAKER_THRESHOLD,
+            probe_interval=settings.REDIS_BREAKER_PROBE_INTERVAL,
+            probe=lambda: self.redis.ping()
+        )
+
+    def _remember(self, key: str, data: bytes, expire: int):
+        self.local.set(key, data, min(expire, self.l1_ttl) if expire else self.l1_ttl)
+
+    async def get(self, key: str, local: bool = True) -> Optional[Any]:
+        """
+        `local=False` skips the in-process tier, for values whose deletion must
+        be seen by every process immediately.
+        """
+        data = self.local.get(key) if local else None
+        if data is not None:
+            self.stats.record(key, "l1_hits")
+            return decode_value(data)
+        if not self.breaker.allow():
+            self.stats.record(key, "skipped")
+            return None
+
         try:
-            val = await self.redis.get(key)
-            return json.loads(val) if val else None
+            start = time.perf_counter()
+            data = await self.redis.get(key)
+            self.stats.record_latency([key], time.perf_counter() - start)
+            self.breaker.record_success()
         except Exception as e:
+            self.stats.record(key, "errors")
+            self.breaker.record_failure()
             print(f"⚠️ Cache Get Error: {e}")
             return None
 
-    async def set(self, key: str, value: Any, expire: int = 3600):
+        if not data:
+            self.stats.record(key, "misses")
+            return None
+        self.stats.record(key, "l2_hits")
+        if local:
+            self._remember(key, data, self.l1_ttl)
+        return decode_value(data)
+
+    async def mget(self, keys: list) -> list:
+        """
+        Batched get: L1 first, then one Redis round trip for the rest.
+        Returns values in key order, None for misses.
+        """
+        results = [None] * len(keys)
+        remote = []
+        for i, key in enumerate(keys):
+            data = self.local.get(key)
+            if data is not None:
+                self.stats.record(key, "l1_hits")
+                results[i] = decode_value(data)
+            else:
+                remote.append(i)
+        if not remote:
+            return results
+
+        remote_keys = [keys[i] for i in remote]
+        if not self.breaker.allow():
+            for key in remote_keys:
+                self.stats.record(key, "skipped")
+            return results
         try:
-            await self.redis.set(key, json.dumps(value), ex=expire)
+            start = time.perf_counter()
+            values = await self.redis.mget(remote_keys)
+            self.stats.record_latency(remote_keys, time.perf_counter() - start)
+            self.breaker.record_success()
         except Exception as e:
+            for key in remote_keys:
+                self.stats.record(key, "errors")
+            self.breaker.record_failure()
+            print(f"⚠️ Cache MGet Error: {e}")
+            return results
+
+        for i, data in zip(remote, values):
+            if data:
+                self.stats.record(keys[i], "l2_hits")
+                self._remember(keys[i], data, self.l1_ttl)
+                results[i] = decode_value(data)
+            else:
+                self.stats.record(keys[i], "misses")
+        return results
+
+    async def get_list(self, key: str) -> list:
+        """
+        All items of a Redis list (raw), or [] while Redis is unavailable. Never in L1.
+        """
+        if not self.breaker.allow():
+            self.stats.record(key, "skipped")
+            return []
+        try:
+            start = time.perf_counter()
+            items = await self.redis.lrange(key, 0, -1)
+            self.stats.record_latency([key], time.perf_counter() - start)
+            self.breaker.record_success()
+        except Exception as e:
+            self.stats.record(key, "errors")
+            self.breaker.record_failure()
+            print(f"⚠️ Cache LRange Error: {e}")
+            return []
+        self.stats.record(key, "l2_hits" if items else "misses")
+        return items
+
+    async def set(self, key: str, value: Any, expire: int = 3600, local: bool = True):
+        data = encode_value(value, self.compress_threshold)
+        if local:
+            self._remember(key, data, expire)
+        self.stats.record(key, "sets")
+        if not self.breaker.allow():
+            self.stats.record(key, "skipped")
+            return
+        try:
+            start = time.perf_counter()
+            await self.redis.set(key, data, ex=expire)
+            self.stats.record_latency([key], time.perf_counter() - start)
+            self.breaker.record_success()
+        except Exception as e:
+            self.stats.record(key, "errors")
+            self.breaker.record_failure()
             print(f"⚠️ Cache Set Error: {e}")
 
+    async def mset(self, mapping: dict, expire: int = 3600):
+        """
+        Batched set with a shared expiry, pipelined into one round trip.
+        """
+        if not mapping:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for key, value in mapping.items():
+            data = encode_value(value, self.compress_threshold)
+            self._remember(key, data, expire)
+            self.stats.record(key, "sets")
+            pipe.set(key, data, ex=expire)
+        if not self.breaker.allow():
+            for key in mapping:
+                self.stats.record(key, "skipped")
+            return
+        try:
+            start = time.perf_counter()
+            await pipe.execute()
+            self.stats.record_latency(list(mapping), time.perf_counter() - start)
+            self.breaker.record_success()
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"⚠️ Cache MSet Error: {e}")
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.local.delete(key)
+        if not self.breaker.allow():
+            return
+        try:
+            await self.redis.delete(*keys)
+            self.breaker.record_success()
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"⚠️ Cache Delete Error: {e}")
+
+    def snapshot(self):
+        return {
+            "l1_items": len(self.local),
+            "l1_bytes": self.local.size_bytes,
+            "namespaces": self.stats.snapshot(),
+            "breaker": self.breaker.stats(),
+        }
+
     async def close(self):
+        await self.breaker.close()
         await self.redis.close()
 
-cache = CacheService()
\ No newline at end of file
+cache = CacheService()
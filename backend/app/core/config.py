@@ -18,12 +18,61 @@ class Settings(BaseSettings):
     # Security
     CLERK_PEM_PUBLIC_KEY: str = ""
     CLERK_ISSUER: str = ""
+    CLERK_JWKS_URL: str = ""  # Defaults to {CLERK_ISSUER}/.well-known/jwks.json
+    JWKS_CACHE_TTL: int = 3600
+    JWKS_MIN_REFRESH_INTERVAL: int = 30
+    TOKEN_CACHE_SIZE: int = 10000  # 0 disables the verified-token cache
     
     # AI
     GOOGLE_API_KEY: str = ""
+    ACTOR_CACHE_TTL: int = 7 * 24 * 3600  # Actor search results, keyed by role signature
+    ACTOR_CATALOG_MIN_CANDIDATES: int = 5  # Fresh catalog actors needed to skip a search; 0 disables
+    ACTOR_CATALOG_MAX_AGE: int = 30 * 24 * 3600
+    ACTOR_SEARCH_BATCH_SIZE: int = 6  # Roles packed into one grounded search call; 1 disables batching
+    ACTOR_SEARCH_BATCH_MAX_CHARS: int = 16000  # Expected response size a batch may grow to
+    ACTOR_SEARCH_BATCH_WINDOW: float = 0.2  # Seconds a partial batch waits for more roles
+    LLM_MAX_IN_FLIGHT: int = 8  # Per process, shared by every pipeline stage
+    LLM_REQUESTS_PER_MINUTE: int = 120  # 0 disables throttling
+    LLM_MAX_RETRIES: int = 4
+    LLM_RETRY_BASE_DELAY: float = 1.0
+
+    # Project listing
+    PROJECTS_PAGE_SIZE: int = 50
+    PROJECTS_MAX_PAGE_SIZE: int = 200
+    PROJECT_CACHE_TTL: int = 24 * 3600  # Serialized bodies of completed projects
+    TRACE_MAX_ATTEMPTS: int = 5  # Execution traces kept per project
+    PROJECT_REUSE_MAX_AGE: int = 7 * 24 * 3600  # Identical submissions reuse results this recent; 0 disables
 
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
+    REDIS_CONNECT_TIMEOUT: float = 1.0
+    REDIS_SOCKET_TIMEOUT: float = 2.0  # Must exceed the worker's 1s blocking claim
+    REDIS_BREAKER_THRESHOLD: int = 3  # Consecutive failures before Redis is skipped
+    REDIS_BREAKER_PROBE_INTERVAL: float = 5.0
+    CACHE_L1_MAX_ITEMS: int = 2048  # In-process tier in front of Redis; 0 disables it
+    CACHE_L1_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_L1_TTL: int = 300  # Upper bound on how stale a process-local copy can get
+    CACHE_COMPRESS_THRESHOLD: int = 2048  # zlib-compress encoded values at least this large
+
+    # Jobs: 'redis' (durable queue + app.worker) or 'inline' (FastAPI BackgroundTasks)
+    JOB_BACKEND: str = "redis"
+    WORKER_CONCURRENCY: int = 4
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 5.0
+    JOB_VISIBILITY_TIMEOUT: int = 600
+    JOB_MAINTENANCE_INTERVAL: float = 5.0
+    JOB_RECOVERY_GRACE: int = 60
+    WORKER_METRICS_PORT: int = 9100  # Prometheus endpoint of app.worker; 0 disables it
+
+    # Optimizer: 'exact' (branch-and-bound), 'frontier' (exact plus top-K and Pareto alternatives) or 'ppo' (legacy RL agent)
+    OPTIMIZER_MODE: str = "exact"
+    OPTIMIZER_NODE_LIMIT: int = 200000
+    OPTIMIZER_TOP_K: int = 5  # Ranked alternatives kept in frontier mode
+    OPTIMIZER_PARETO_POINTS: int = 25  # Pareto casts stored per project
+    OPTIMIZER_PARETO_MAX_FRONTIER: int = 500  # Partial front size before epsilon-box thinning
+    OPTIMIZER_WORKERS: int = 2
+    OPTIMIZER_MAX_QUEUE: int = 32
+    OPTIMIZER_TORCH_THREADS: int = 1
 
     def model_post_init(self, __context):
         # 1. If DATABASE_URL is provided (by Render), fix the scheme for AsyncPG
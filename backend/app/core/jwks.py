@@ -0,0 +1,132 @@
+import asyncio
+import json
+import time
+from typing import Optional
+import httpx
+from jwt.algorithms import RSAAlgorithm
+from app.core.config import settings
+
+
+class UnknownKeyError(Exception):
+    pass
+
+
+class JWKSKeyStore:
+    """
+    Process-wide cache of the issuer's signing keys, indexed by `kid`.
+
+    Keys are parsed once per fetch and refreshed in the background every `ttl`
+    seconds. A token signed with an unknown `kid` triggers an on-demand refresh,
+    rate limited to one per `min_refresh_interval` once a key set is loaded, and
+    coalesced so concurrent requests share a single fetch. Until the first fetch
+    succeeds every miss retries, so an issuer blip at startup is not a 30 s outage.
+    """
+
+    def __init__(self, jwks_url: str, ttl: int = 3600, min_refresh_interval: int = 30,
+                 client: Optional[httpx.AsyncClient] = None):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._client = client
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # One pooled client for the process: keeps TLS connections to the issuer warm
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(5.0),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            )
+        return self._client
+
+    async def _fetch(self):
+        self._last_attempt = time.monotonic()
+        response = await self.client.get(self.jwks_url)
+        response.raise_for_status()
+
+        keys = {}
+        for jwk in response.json().get('keys', []):
+            if jwk.get('kty') != 'RSA':
+                continue
+            keys[jwk.get('kid')] = RSAAlgorithm.from_jwk(json.dumps(jwk))
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        return keys
+
+    async def refresh(self):
+        """
+        Fetches the key set. Concurrent callers await the same in-flight fetch.
+        """
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, future):
+        self._inflight = None
+        if not future.cancelled():
+            future.exception()  # Mark retrieved; callers already saw it
+
+    async def get_key(self, kid: Optional[str]):
+        key = self._lookup(kid)
+        if key is None and self._can_refresh():
+            # Cold cache or unknown kid: the issuer may have rotated keys since our last fetch
+            await self.refresh()
+            key = self._lookup(kid)
+
+        if key is None:
+            raise UnknownKeyError(f"No signing key for kid={kid!r}")
+        return key
+
+    def _can_refresh(self):
+        # Without any keys every request would fail, so always retry (concurrent misses share one fetch)
+        if self._inflight is not None or not self._keys:
+            return True
+        return time.monotonic() - self._last_attempt >= self.min_refresh_interval
+
+    def _lookup(self, kid):
+        if kid in self._keys:
+            return self._keys[kid]
+        if kid is None and len(self._keys) == 1:
+            return next(iter(self._keys.values()))
+        return None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the previous keys until the issuer is reachable again
+                print(f"⚠️ JWKS Refresh Error: {e}")
+
+    def start(self):
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self):
+        return {
+            "keys": len(self._keys),
+            "age_seconds": time.monotonic() - self._fetched_at if self._fetched_at else None,
+        }
+
+
+jwks_store = JWKSKeyStore(
+    settings.CLERK_JWKS_URL or f"{settings.CLERK_ISSUER}/.well-known/jwks.json",
+    ttl=settings.JWKS_CACHE_TTL,
+    min_refresh_interval=settings.JWKS_MIN_REFRESH_INTERVAL,
+)
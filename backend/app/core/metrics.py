@@ -0,0 +1,106 @@
+import time
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Request latencies are mostly sub-second; pipeline stages and LLM calls run for seconds
+_FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+_SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+REQUEST_LATENCY = Histogram(
+    "castos_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=_FAST_BUCKETS,
+)
+STAGE_DURATION = Histogram(
+    "castos_pipeline_stage_duration_seconds", "Project pipeline stage duration",
+    ["stage"], buckets=_SLOW_BUCKETS,
+)
+LLM_CALLS = Counter(
+    "castos_llm_calls_total", "LLM calls by pipeline stage and outcome (ok, error, rate_limited)",
+    ["stage", "outcome"],
+)
+LLM_LATENCY = Histogram(
+    "castos_llm_call_duration_seconds", "LLM call latency, excluding limiter queueing",
+    ["stage"], buckets=_SLOW_BUCKETS,
+)
+JOB_QUEUE_DEPTH = Gauge("castos_job_queue_depth", "Jobs per queue structure", ["state"])
+
+
+class ProcessStatsCollector:
+    """
+    Reads the counters the services already keep (cache, DB pool, LLM limiter,
+    optimizer pool) at scrape time, so the hot paths pay nothing extra.
+    """
+
+    def __init__(self, cache_service, db_engine, llm_limiter, optimizer_executor):
+        self.cache = cache_service
+        self.engine = db_engine
+        self.llm = llm_limiter
+        self.optimizer = optimizer_executor
+
+    def collect(self):
+        snapshot = self.cache.snapshot()
+        lookups = CounterMetricFamily("castos_cache_lookups", "Cache lookups by namespace and result", labels=["namespace", "result"])
+        hit_ratio = GaugeMetricFamily("castos_cache_hit_ratio", "Cache hit ratio (both tiers) by namespace", labels=["namespace"])
+        for name, ns in snapshot["namespaces"].items():
+            for result in ("l1_hits", "l2_hits", "misses", "errors", "skipped"):
+                lookups.add_metric([name, result], ns[result])
+            hit_ratio.add_metric([name], ns["hit_ratio"])
+        yield lookups
+        yield hit_ratio
+        yield GaugeMetricFamily("castos_cache_l1_items", "Entries in the in-process cache tier", value=snapshot["l1_items"])
+        yield GaugeMetricFamily("castos_cache_l1_bytes", "Bytes held by the in-process cache tier", value=snapshot["l1_bytes"])
+        yield GaugeMetricFamily("castos_redis_circuit_open", "1 while Redis is being skipped", value=int(snapshot["breaker"]["state"] != "closed"))
+
+        pool = self.engine.sync_engine.pool
+        for name, attr in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+            if hasattr(pool, attr):
+                yield GaugeMetricFamily(f"castos_db_pool_{name}", f"SQLAlchemy pool {name.replace('_', ' ')}", value=getattr(pool, attr)())
+
+        llm = self.llm.stats()
+        yield GaugeMetricFamily("castos_llm_in_flight", "LLM calls in progress", value=llm["in_flight"])
+        yield GaugeMetricFamily("castos_llm_waiting", "LLM calls waiting for a limiter slot", value=llm["waiting"])
+
+        optimizer = self.optimizer.stats()
+        yield GaugeMetricFamily("castos_optimizer_queue_depth", "Optimizer jobs waiting for a pool slot", value=optimizer["queue_depth"])
+        yield GaugeMetricFamily("castos_optimizer_in_flight", "Optimizer jobs running", value=optimizer["in_flight"])
+
+
+def register_process_stats(cache_service, db_engine, llm_limiter, optimizer_executor):
+    REGISTRY.register(ProcessStatsCollector(cache_service, db_engine, llm_limiter, optimizer_executor))
+
+
+def set_job_queue_depth(depth: dict):
+    for state, count in depth.items():
+        JOB_QUEUE_DEPTH.labels(state).set(count)
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording request latency per route template (not raw path,
+    which would explode label cardinality). Streaming responses are timed to
+    their last body chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"], route.path if route is not None else "unmatched", str(status)
+            ).observe(time.perf_counter() - start)
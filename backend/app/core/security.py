@@ -2,9 +2,8 @@ import jwt
 from fastapi import HTTPException, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
-import httpx
-from jwt.algorithms import RSAAlgorithm
-import json
+from app.core.jwks import jwks_store
+from app.core.token_cache import token_cache
 
 security = HTTPBearer()
 
@@ -14,17 +13,24 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
     """
     token = credentials.credentials
     
-    try:
-        # In production, cache the JWKS keys
-        jwks_url = f"{settings.CLERK_ISSUER}/.well-known/jwks.json"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(jwks_url)
-            jwks = response.json()
+    # Repeat requests with an already-verified token skip RS256 verification
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = await _verify_token(token)
+        token_cache.put(token, payload)
+
+    return {
+        "id": payload.get("sub"),
+        "email": payload.get("email", "")
+    }
 
-        public_key = RSAAlgorithm.from_jwk(json.dumps(jwks['keys'][0]))
+async def _verify_token(token: str) -> dict:
+    try:
+        # Signing keys come from the process-wide JWKS cache, selected by the token's kid
+        kid = jwt.get_unverified_header(token).get('kid')
+        public_key = await jwks_store.get_key(kid)
         
-        payload = jwt.decode(
+        return jwt.decode(
             token,
             public_key,
             algorithms=["RS256"],
@@ -32,15 +38,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
             issuer=settings.CLERK_ISSUER
         )
         
-        return {
-            "id": payload.get("sub"),
-            "email": payload.get("email", "")
-        }
-        
     except Exception as e:
         print(f"Auth Error: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
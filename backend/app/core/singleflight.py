@@ -0,0 +1,143 @@
+import asyncio
+import copy
+import time
+import uuid
+from app.core.cache import cache
+
+LOCK_PREFIX = "sf:lock:"
+
+# Delete the lock only if we still own it (it may have expired and been re-taken)
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Coalesces identical expensive calls whose result lands in the cache.
+
+    Within a process, concurrent callers for the same key await one shared
+    future. Across workers, a Redis lock elects one leader; the others poll
+    the cache key until the leader's result shows up, or take over if the
+    leader gave up without producing one.
+    """
+
+    def __init__(self, cache_service, lock_ttl: int = 120, poll_interval: float = 0.25):
+        self.cache = cache_service
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._inflight = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, fn, expire: int):
+        """
+        Returns fn()'s result for `key`, running fn at most once across concurrent
+        callers. Truthy results are stored in the cache under `key` for `expire` seconds.
+        Every caller gets its own copy, so callers may mutate the result freely.
+        If the leader is cancelled, its followers take over instead of inheriting
+        the cancellation.
+        """
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            self.followers += 1
+            try:
+                return copy.deepcopy(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                # Only the leader was cancelled (e.g. its pipeline failed elsewhere): run fn ourselves
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._inflight[key] = future
+        try:
+            result = await self._run_distributed(key, fn, expire)
+            future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._inflight[key]
+        return copy.deepcopy(result)
+
+    async def _run_distributed(self, key: str, fn, expire: int):
+        lock_key = f"{LOCK_PREFIX}{key}"
+        deadline = time.monotonic() + self.lock_ttl
+        while True:
+            if not self.cache.breaker.allow():
+                # Redis is down: coalesce within this process only
+                return await self._lead(key, fn, expire, None, None)
+            token = uuid.uuid4().hex
+            try:
+                acquired = await self.cache.redis.set(lock_key, token, nx=True, ex=self.lock_ttl)
+            except Exception as e:
+                self.cache.breaker.record_failure()
+                print(f"⚠️ SingleFlight Lock Error: {e}")
+                return await self._lead(key, fn, expire, None, None)
+
+            if acquired:
+                return await self._lead(key, fn, expire, lock_key, token)
+
+            # Another worker is computing this key: wait for its result
+            self.followers += 1
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                result = await self.cache.get(key)
+                if result:
+                    return result
+                try:
+                    if not await self.cache.redis.exists(lock_key):
+                        break  # Leader finished without a result; try to lead ourselves
+                except Exception:
+                    self.cache.breaker.record_failure()
+                    break
+            else:
+                return await self._lead(key, fn, expire, None, None)
+
+    async def _lead(self, key, fn, expire, lock_key, token):
+        self.leaders += 1
+        try:
+            result = await fn()
+            if result:
+                await self.cache.set(key, result, expire=expire)
+            return result
+        finally:
+            if lock_key is not None:
+                await self._release(lock_key, token)
+
+    async def _release(self, lock_key, token):
+        if not self.cache.breaker.allow():
+            return  # The lock expires on its own
+        try:
+            await self.cache.redis.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+            return
+        except Exception:
+            pass
+        # Servers without scripting (e.g. fakeredis without Lua): non-atomic compare-and-delete
+        try:
+            current = await self.cache.redis.get(lock_key)
+            if current in (token, token.encode()):
+                await self.cache.redis.delete(lock_key)
+        except Exception as e:
+            print(f"⚠️ SingleFlight Unlock Error: {e}")
+
+    def stats(self):
+        return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._inflight)}
+
+
+def _consume_exception(future):
+    # Followers re-raise it; this only silences "exception never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+singleflight = SingleFlight(cache)
@@ -0,0 +1,65 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+from app.core.config import settings
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already-verified JWT claims.
+
+    Entries are keyed by a SHA-256 of the raw token (tokens are never stored)
+    and expire at the token's own `exp`, so a cached entry is never valid
+    longer than the token itself.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, claims = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, claims: dict):
+        expires_at = claims.get('exp')
+        if not expires_at or self.max_size <= 0:
+            return  # Tokens without exp are always re-verified
+
+        key = self._key(token)
+        self._entries[key] = (float(expires_at), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+token_cache = VerifiedTokenCache(max_size=settings.TOKEN_CACHE_SIZE)
@@ -0,0 +1,106 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Spans beyond this are counted but not recorded, so a trace stays small enough for a JSON column
+MAX_SPANS = 300
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_parent: ContextVar[Optional[int]] = ContextVar("trace_parent", default=None)
+
+
+class Trace:
+    """
+    Spans recorded while one project attempt runs. Shared by every task spawned
+    under it (asyncio copies the context), so parallel actor searches nest
+    under the span that started them.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self.dropped = 0
+
+    def offset_ms(self) -> float:
+        return round((time.perf_counter() - self._t0) * 1000, 2)
+
+    def to_dict(self, status: str, error: str = ""):
+        data = {
+            "started_at": self.started_at,
+            "duration_ms": self.offset_ms(),
+            "status": status,
+            "spans": self.spans,
+        }
+        if error:
+            data["error"] = error[:500]
+        if self.dropped:
+            data["dropped_spans"] = self.dropped
+        return data
+
+
+class Span:
+    def __init__(self, record):
+        self.record = record
+
+    def set(self, **attrs):
+        if self.record is not None:
+            self.record.update(attrs)
+
+
+_NOOP = Span(None)
+
+
+@contextmanager
+def record_trace():
+    """
+    Records spans opened inside the block, including in tasks it creates.
+    """
+    trace = Trace()
+    trace_token = _trace.set(trace)
+    parent_token = _parent.set(None)
+    try:
+        yield trace
+    finally:
+        _parent.reset(parent_token)
+        _trace.reset(trace_token)
+
+
+def current_span() -> Span:
+    """
+    The innermost open span, for annotating it (e.g. with a cache hit) from nested code.
+    """
+    trace = _trace.get()
+    parent = _parent.get()
+    if trace is None or parent is None:
+        return _NOOP
+    return Span(trace.spans[parent])
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Times the enclosed block as a child of the current span. Free when no trace is active.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield _NOOP
+        return
+    if len(trace.spans) >= MAX_SPANS:
+        trace.dropped += 1
+        yield _NOOP
+        return
+
+    record = {"id": len(trace.spans), "parent": _parent.get(), "name": name, "start_ms": trace.offset_ms(), **attrs}
+    trace.spans.append(record)
+    token = _parent.set(record["id"])
+    start = time.perf_counter()
+    try:
+        yield Span(record)
+    except Exception as e:
+        record["error"] = str(e)[:200]
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        _parent.reset(token)
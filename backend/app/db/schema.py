@@ -0,0 +1,30 @@
+from sqlalchemy import inspect, text
+from app.db.base import Base
+
+# Make sure every model is registered on Base.metadata
+from app.models import actor, project, user  # noqa: F401
+
+
+def sync_schema(conn):
+    """
+    create_all() plus the additive changes it skips on existing tables:
+    new nullable columns and new indexes. There are no migrations, so columns
+    added to a model must be nullable (or have a server default).
+    Run with `await conn.run_sync(sync_schema)`.
+    """
+    Base.metadata.create_all(conn)
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                print(f"🛠️ Adding column {table.name}.{column.name}")
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"))
+
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                print(f"🛠️ Creating index {index.name}")
+                index.create(conn)
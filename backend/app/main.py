@@ -1,17 +1,41 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.routes import projects, auth
-from app.db.base import Base
+from app.db.schema import sync_schema
 from app.db.session import engine
 from app.core.cache import cache
+from app.core.jwks import jwks_store
+from app.core.token_cache import token_cache
+from app.services.executor import optimizer_executor
+from app.services.jobs import job_queue
+from app.services.progress import progress_hub
+from app.services.ai_engine import stage_cache_stats
+from app.services.llm_limiter import llm_limiter
+from app.core.singleflight import singleflight
+from app.core.metrics import PrometheusMiddleware, register_process_stats, set_job_queue_depth
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from contextlib import asynccontextmanager
 import time
 
 async def init_db():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(sync_schema)
 
-app = FastAPI(title=settings.PROJECT_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    jwks_store.start()
+    yield
+    await progress_hub.close()
+    await jwks_store.close()
+    await optimizer_executor.shutdown()
+    await cache.close()
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+
+app.add_middleware(PrometheusMiddleware)
+register_process_stats(cache, engine, llm_limiter, optimizer_executor)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,30 +43,53 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-@app.on_event("startup")
-async def startup_event():
-    await init_db()
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    await cache.close()
-
 # REGISTER ROUTES
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"]) # <--- WAS MISSING
 app.include_router(projects.router, prefix="/api/projects", tags=["projects"])
 
-# METRICS ENDPOINT
+async def _job_queue_depth():
+    if not cache.breaker.allow():
+        return None
+    try:
+        return await job_queue.depth()
+    except Exception:
+        cache.breaker.record_failure()
+        return None
+
+# METRICS ENDPOINT (Prometheus text format)
 @app.get("/metrics")
 async def get_metrics():
+    jobs = await _job_queue_depth()
+    if jobs is not None:
+        set_job_queue_depth(jobs)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# Human-readable snapshot of the same internals
+@app.get("/metrics/summary")
+async def get_metrics_summary():
+    jobs = await _job_queue_depth()
     return {
         "status": "up",
         "timestamp": time.time(),
         "service": "castos-backend",
-        "db_status": "connected" # simplified
+        "optimizer": optimizer_executor.stats(),
+        "jwks": jwks_store.stats(),
+        "token_cache": token_cache.stats(),
+        "jobs": jobs,
+        "stage_cache": stage_cache_stats.snapshot(),
+        "llm": llm_limiter.stats(),
+        "singleflight": singleflight.stats(),
+        "cache": cache.snapshot()
     }
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    # Redis being down degrades caching and progress streaming, not the API itself
+    breaker = cache.breaker.stats()
+    return {
+        "status": "ok" if breaker["state"] == "closed" else "degraded",
+        "redis": breaker,
+    }
\ No newline at end of file
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class Actor(Base):
+    """
+    Catalog of actors seen in grounded searches, reused as candidates for later projects.
+    """
+    __tablename__ = "actors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    industry = Column(String, nullable=False)  # 'Hollywood' / 'Bollywood'
+    gender = Column(String, nullable=False)  # 'male' / 'female' / 'any'
+    traits = Column(String)  # Trait tokens of the role it was last found for, as ',brave,loyal,'
+
+    salary = Column(Float)
+    box_office = Column(Float)
+    rating = Column(Float)
+    versatility = Column(Float)
+    risk = Column(Float)
+
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("name", "industry", name="uq_actors_name_industry"),
+        # Candidate lookup: equality on industry and gender, range on salary
+        Index("ix_actors_industry_gender_salary", "industry", "gender", "salary"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, DateTime
+from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, Index
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -17,5 +17,20 @@ class Project(Base):
     
     raw_characters = Column(JSON) 
     optimization_result = Column(JSON, nullable=True)
+    # Completed pipeline stages of an unfinished run, so a retry can resume
+    pipeline_state = Column(JSON, nullable=True)
+    # Span timings of the most recent attempts (see app.core.tracing)
+    trace = Column(JSON, nullable=True)
+    # Normalized (plot, budget, industry) hash; identical submissions share one result
+    fingerprint = Column(String(64), index=True, nullable=True)
+    # Project whose result this one copies (or waits on, while pending)
+    reused_from = Column(Integer, nullable=True)
+    # Bumped whenever a completed result is replaced; part of the cached response's key
+    result_version = Column(Integer, nullable=True)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Keyset pagination of a user's projects, newest first
+        Index("ix_projects_user_created", "user_id", created_at.desc(), id.desc()),
+    )
@@ -1,11 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import asyncio
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.orm import load_only
 from app.db.session import get_db
 from app.core.security import get_current_user
 from app.models.project import Project
-from app.schemas.project import ProjectCreate, ProjectResponse
+from app.schemas.project import ProjectCreate, ProjectResponse, ProjectSummary, ReoptimizeRequest, ReoptimizeResponse
 from app.services.runner import process_project_background
+from app.services.jobs import job_queue
+from app.services.optimizer import apply_constraints, run_what_if
+from app.services.cast_solver import ScoreWeights
+from app.services import progress, project_cache, reuse
+from app.services.ai_engine import stage_cache_stats
+from app.services.progress import progress_hub
+from app.core.config import settings
+from app.core.cache import cache
 
 router = APIRouter()
 
@@ -16,6 +31,14 @@ async def create_project(
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
+    """
+    Identical submissions (same normalized plot, budget and industry) share a
+    result: the new project copies a completed one, or waits on one still
+    running, unless `force_fresh` is set.
+    """
+    fingerprint = reuse.project_fingerprint(data.plot, data.budget, data.industry)
+    source = None if data.force_fresh else await reuse.find_source(db, fingerprint)
+
     # 1. Create DB Entry IMMEDIATELY as "pending"
     new_project = Project(
         user_id=current_user['id'],
@@ -23,21 +46,130 @@ async def create_project(
         plot=data.plot,
         budget_cap=data.budget,
         industry=data.industry,
-        status="pending"
+        status="pending",
+        fingerprint=fingerprint
     )
-    
+    if source:
+        reuse.adopt(new_project, source)
+    stage_cache_stats.record("project", source is not None)
+
     db.add(new_project)
     await db.commit()
     await db.refresh(new_project)
-    
-    # 2. Trigger Background Task
-    background_tasks.add_task(process_project_background, new_project.id)
-    
+
+    if source and new_project.status == "pending":
+        # The source may have finished before this row existed, missing it in its follower update
+        source_id = source.id
+        result = await db.execute(
+            select(Project).where(Project.id == source_id).execution_options(populate_existing=True)
+        )
+        source = result.scalars().first()
+        # A concurrent delete of the source may already have handed this project to another one
+        await db.refresh(new_project)
+        if new_project.reused_from == source_id and (not source or source.status != "pending"):
+            if source and source.status == "completed":
+                reuse.adopt(new_project, source)
+            else:
+                new_project.reused_from = None
+            await db.commit()
+            await db.refresh(new_project)
+            if new_project.reused_from is None:
+                await dispatch_project(new_project.id, background_tasks)
+    elif not source:
+        # 2. Hand off to the worker queue (or run in-process when configured / Redis is down)
+        await dispatch_project(new_project.id, background_tasks)
+
     return new_project
 
+@router.post("/{project_id}/retry", response_model=ProjectResponse)
+async def retry_project(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Re-runs a failed project. Stages checkpointed by the failed run are reused,
+    so only the failed actor searches and the optimization run again.
+    """
+    project = await db.get(Project, project_id)
+    if not project or project.user_id != current_user['id']:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if project.status != "failed":
+        raise HTTPException(status_code=409, detail=f"Only failed projects can be retried (status: {project.status})")
+
+    project.status = "pending"
+    await db.commit()
+    await db.refresh(project)
+
+    # Event streams for the new run must not replay the old run's 'failed'
+    await progress.reset(project_id)
+    await dispatch_project(project_id, background_tasks)
+    return project
+
+async def dispatch_project(project_id: int, background_tasks: BackgroundTasks):
+    if settings.JOB_BACKEND == "redis" and cache.breaker.allow():
+        try:
+            await job_queue.enqueue(project_id)
+            return
+        except Exception as e:
+            cache.breaker.record_failure()
+            print(f"⚠️ Enqueue Error, running project {project_id} in-process: {e}")
+    background_tasks.add_task(process_project_background, project_id)
+
+@router.post("/{project_id}/reoptimize", response_model=ReoptimizeResponse)
+async def reoptimize_project(
+    project_id: int,
+    data: ReoptimizeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    What-if re-optimization of a completed project over the candidate actors
+    already stored in raw_characters: new budget cap, locked or excluded actors,
+    reward weights. No LLM calls, so it is cheap enough for interactive sliders.
+    With `apply` the new cast and budget replace the project's result.
+    """
+    project = await db.get(Project, project_id)
+    if not project or project.user_id != current_user['id']:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if project.status != "completed" or not project.raw_characters:
+        raise HTTPException(status_code=409, detail=f"Only completed projects can be re-optimized (status: {project.status})")
+
+    budget = data.budget if data.budget is not None else project.budget_cap
+    try:
+        characters = apply_constraints(project.raw_characters.get('characters', []), data.locked, data.excluded)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # A millisecond NumPy solve: a thread avoids the process pool's spawn and pickling cost
+    result = await asyncio.to_thread(run_what_if, characters, budget, ScoreWeights(**data.weights.model_dump()))
+
+    if data.apply:
+        # Stored top-K / Pareto alternatives were ranked under the old budget and are dropped
+        old_version = project.result_version
+        project.optimization_result = result['cast']
+        project.budget_cap = budget
+        project.result_version = (old_version or 0) + 1
+        # The result is no longer a function of (plot, budget, industry) alone
+        project.fingerprint = None
+        await db.commit()
+        await project_cache.invalidate(project_id, current_user['id'], old_version)
+
+    return ReoptimizeResponse(
+        project_id=project_id,
+        budget_cap=budget,
+        optimization_result=result['cast'],
+        total_salary=sum(float(r.get('salary') or 0) for r in result['cast']),
+        score=result['score'],
+        optimal=result['optimal'],
+        applied=data.apply,
+    )
+
 @router.delete("/{project_id}")
 async def delete_project(
     project_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -47,26 +179,150 @@ async def delete_project(
     
     if not project or project.user_id != current_user['id']:
         raise HTTPException(status_code=404, detail="Project not found or unauthorized")
-        
+
+    # Identical submissions (possibly other users') waiting on this one run on their own
+    heir = await reuse.reassign_followers(db, project_id)
+    version = project.result_version
     await db.delete(project)
     await db.commit()
+    await project_cache.invalidate(project_id, current_user['id'], version)
+    if heir is not None:
+        await dispatch_project(heir, background_tasks)
     return {"status": "deleted"}
 
-@router.get("/", response_model=list[ProjectResponse])
+def _encode_cursor(project) -> str:
+    raw = json.dumps([project.created_at.isoformat(), project.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(project_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/", response_model=list[ProjectSummary])
 async def get_projects(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    result = await db.execute(select(Project).where(Project.user_id == current_user['id']).order_by(Project.created_at.desc()))
-    return result.scalars().all()
+    """
+    Newest-first page of the user's projects without the heavy JSON columns.
+    When more exist, the X-Next-Cursor header holds the `cursor` for the next page.
+    """
+    limit = min(limit or settings.PROJECTS_PAGE_SIZE, settings.PROJECTS_MAX_PAGE_SIZE)
+    query = (
+        select(Project)
+        .options(load_only(
+            Project.id, Project.title, Project.plot, Project.budget_cap,
+            Project.industry, Project.status, Project.created_at
+        ))
+        .where(Project.user_id == current_user['id'])
+        .order_by(Project.created_at.desc(), Project.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        # Keyset: rows strictly after the cursor in (created_at, id) order
+        query = query.where(tuple_(Project.created_at, Project.id) < tuple_(*_decode_cursor(cursor)))
+
+    result = await db.execute(query)
+    projects = result.scalars().all()
+    if len(projects) > limit:
+        projects = projects[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(projects[-1])
+    return projects
     
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    The serialized body of a completed project is cached per result version and
+    served with a strong ETag; a matching If-None-Match gets a 304. A primary-key
+    lookup of owner, status and version always runs first, so the cache never
+    answers for a deleted project or a replaced result.
+    """
+    row = (await db.execute(
+        select(Project.user_id, Project.status, Project.result_version).where(Project.id == project_id)
+    )).first()
+    if not row or row.user_id != current_user['id']:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    cached = None
+    if row.status == "completed":
+        cached = await project_cache.get_body(project_id, current_user['id'], row.result_version)
+    if cached is None:
+        project = await db.get(Project, project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if project.status != "completed":
+            return project
+        cached = await project_cache.put_body(project_id, current_user['id'], project)
+
+    etag, body = cached
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if project_cache.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/{project_id}/trace")
+async def get_project_trace(
+    project_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stage timings of the project's most recent execution attempts, oldest first.
+    Each span has a parent id, start offset and duration in ms, plus stage details
+    such as cache hit/miss, actor-search source and LLM attempts.
+    """
+    result = await db.execute(
+        select(Project.user_id, Project.status, Project.trace).where(Project.id == project_id)
+    )
+    row = result.first()
+    if not row or row.user_id != current_user['id']:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return {"project_id": project_id, "status": row.status, "attempts": row.trace or []}
+
+@router.get("/{project_id}/events")
+async def stream_project_events(
+    project_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
+    """
+    Server-Sent Events stream of pipeline stages for a project.
+    Ends after the 'completed' or 'failed' event.
+    """
     project = await db.get(Project, project_id)
     if not project or project.user_id != current_user['id']:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
\ No newline at end of file
+    status = project.status
+    # Give the pooled connection back; the stream can stay open for minutes
+    await db.close()
+
+    async def event_source():
+        if status != "pending":
+            yield f"event: {status}\ndata: {json.dumps({'event': status, 'project_id': project_id})}\n\n"
+            return
+
+        async for message in progress_hub.subscribe(project_id):
+            if await request.is_disconnected():
+                break
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {json.loads(message)['event']}\ndata: {message}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
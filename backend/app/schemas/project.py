@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Any, Dict, List
 from datetime import datetime
 
 class ProjectCreate(BaseModel):
@@ -7,6 +7,22 @@ class ProjectCreate(BaseModel):
     plot: str
     budget: float
     industry: str = "Hollywood"
+    force_fresh: bool = False  # Run the pipeline even if an identical submission has a result
+
+class ProjectSummary(BaseModel):
+    """
+    List view of a project: everything except the heavy JSON columns.
+    """
+    id: int
+    title: str
+    plot: str
+    budget_cap: float
+    industry: str
+    status: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
 
 class ProjectResponse(BaseModel):
     id: int
@@ -17,7 +33,34 @@ class ProjectResponse(BaseModel):
     status: str  # <--- Added
     raw_characters: Optional[Any] = None
     optimization_result: Optional[Any] = None
+    reused_from: Optional[int] = None
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class RewardWeights(BaseModel):
+    """
+    Multipliers on the casting reward's terms (see cast_solver.ScoreWeights).
+    """
+    box_office: float = Field(1.0, ge=0)
+    rating: float = Field(1.0, ge=0)
+    versatility: float = Field(1.0, ge=0)
+    risk: float = Field(1.0, ge=0)
+    budget: float = Field(1.0, ge=0)
+
+class ReoptimizeRequest(BaseModel):
+    budget: Optional[float] = Field(None, gt=0)  # Defaults to the project's budget cap
+    locked: Dict[str, str] = {}  # Role name -> actor name
+    excluded: List[str] = []  # Actor names, excluded from every role
+    weights: RewardWeights = RewardWeights()
+    apply: bool = False  # Store the new cast (and budget) as the project's result
+
+class ReoptimizeResponse(BaseModel):
+    project_id: int
+    budget_cap: float
+    optimization_result: List[Any]
+    total_salary: float
+    score: float
+    optimal: bool
+    applied: bool
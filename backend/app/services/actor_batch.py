@@ -0,0 +1,116 @@
+import asyncio
+import math
+from app.core.config import settings
+
+
+class BatchSizer:
+    """
+    Picks how many roles go into one batched actor search. Batches are capped
+    at `max_roles` and at however many roles fit in `max_response_chars`,
+    judged by the response length per role seen so far. Roles are then spread
+    evenly over the fewest batches (7 roles with a cap of 6 -> 4 + 3).
+    """
+
+    def __init__(self, max_roles: int, max_response_chars: int):
+        self.max_roles = max_roles
+        self.max_response_chars = max_response_chars
+        self.chars_per_role = 0.0  # Moving average over batch responses
+
+    def observe(self, response_chars: int, roles: int):
+        if roles <= 0:
+            return
+        sample = response_chars / roles
+        self.chars_per_role = sample if not self.chars_per_role else 0.8 * self.chars_per_role + 0.2 * sample
+
+    def cap(self) -> int:
+        cap = self.max_roles
+        if self.chars_per_role and self.max_response_chars > 0:
+            cap = min(cap, int(self.max_response_chars // self.chars_per_role))
+        return max(cap, 1)
+
+    def size_for(self, roles: int) -> int:
+        if roles <= 1:
+            return 1
+        batches = math.ceil(roles / self.cap())
+        return math.ceil(roles / batches)
+
+
+class ActorSearchBatcher:
+    """
+    Collects the actor searches of one pipeline into batched LLM calls.
+
+    fetch(char) joins the open batch, which is sent once it holds `batch_size`
+    roles or `window` seconds after its first role arrived. Each role resolves
+    as soon as its entry of the batch response streams in. Roles the batch
+    left unanswered (or the whole batch, if the call failed) fall back to
+    one `fetch_one` call per role.
+    """
+
+    def __init__(self, fetch_batch, fetch_one, batch_size: int, window: float):
+        self.fetch_batch = fetch_batch  # async (chars, on_role(index, actors)) -> None
+        self.fetch_one = fetch_one  # async (char) -> actors
+        self.batch_size = max(batch_size, 1)
+        self.window = window
+        self._queue = []
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.fallbacks = 0
+
+    async def fetch(self, char):
+        if self.batch_size == 1:
+            return await self.fetch_one(char)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((char, future))
+        if len(self._queue) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        try:
+            if len(batch) > 1:
+                self.batches += 1
+
+                async def on_role(index, actors):
+                    if 0 <= index < len(batch) and actors and not batch[index][1].done():
+                        batch[index][1].set_result(actors)
+
+                try:
+                    await self.fetch_batch([char for char, _ in batch], on_role)
+                except Exception as e:
+                    print(f"⚠️ Batched actor search for {len(batch)} roles failed: {e}")
+
+            # Unanswered roles are searched one by one
+            missing = [(char, future) for char, future in batch if not future.done()]
+            self.fallbacks += len(missing) if len(batch) > 1 else 0
+
+            async def single(char, future):
+                actors = await self.fetch_one(char)
+                if not future.done():
+                    future.set_result(actors)
+
+            await asyncio.gather(*(single(char, future) for char, future in missing))
+        finally:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result([])
+
+
+actor_batch_sizer = BatchSizer(
+    max_roles=settings.ACTOR_SEARCH_BATCH_SIZE,
+    max_response_chars=settings.ACTOR_SEARCH_BATCH_MAX_CHARS,
+)
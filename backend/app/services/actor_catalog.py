@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.actor import Actor
+
+_STAT_FIELDS = ("salary", "box_office", "rating", "versatility", "risk")
+
+
+def _clean(actor):
+    """
+    Coerces one LLM actor entry to catalog columns; None if it is unusable.
+    """
+    name = str(actor.get('name') or '').strip() if isinstance(actor, dict) else ''
+    if not name:
+        return None
+    row = {"name": name}
+    for field in _STAT_FIELDS:
+        try:
+            row[field] = float(actor.get(field))
+        except (TypeError, ValueError):
+            if field == "salary":
+                return None  # Unusable for budget-range lookups
+            row[field] = None
+    return row
+
+
+class ActorCatalog:
+    """
+    Actors returned by grounded searches, normalized into the `actors` table.
+    A role whose budget range already has enough fresh candidates that were
+    found for a similar role (a majority of its trait tokens) is answered from
+    an indexed query instead of another LLM search. Without the trait match,
+    every same-gender role in a budget range would get the same actors.
+    Failures are logged and treated as "no candidates": the catalog is an
+    optimization and must not fail a pipeline.
+    """
+
+    def __init__(self, session_factory, min_candidates: int, max_age: int):
+        # min_candidates <= 0 disables the catalog (no lookups, no upserts)
+        self.session_factory = session_factory
+        self.min_candidates = min_candidates
+        self.max_age = max_age
+
+    async def find(self, industry: str, gender: str, min_salary: float, max_salary: float, traits):
+        """
+        Returns `min_candidates` fresh actors in the salary range whose role shared
+        a majority of `traits` (closest fit, then best rated first), or None when
+        the catalog does not have enough of them. Roles without traits never match.
+        """
+        tokens = sorted(set(traits or []))
+        if self.min_candidates <= 0 or not tokens:
+            return None
+        fresh_since = datetime.now(timezone.utc) - timedelta(seconds=self.max_age)
+        overlap = sum(case((Actor.traits.like(f"%,{t},%"), 1), else_=0) for t in tokens)
+        query = (
+            select(Actor)
+            .where(
+                Actor.industry == industry,
+                Actor.salary.between(min_salary, max_salary),
+                Actor.refreshed_at >= fresh_since,
+                overlap * 2 > len(tokens),
+            )
+            .order_by(overlap.desc(), Actor.rating.desc(), Actor.box_office.desc())
+            .limit(self.min_candidates)
+        )
+        if gender != "any":
+            query = query.where(Actor.gender == gender)
+        try:
+            async with self.session_factory() as db:
+                rows = (await db.execute(query)).scalars().all()
+        except Exception as e:
+            print(f"⚠️ Actor Catalog Lookup Error: {e}")
+            return None
+        if len(rows) < self.min_candidates:
+            return None
+        return [{"name": r.name, **{f: getattr(r, f) for f in _STAT_FIELDS}} for r in rows]
+
+    async def record(self, actors, industry: str, gender: str, traits):
+        """
+        Upserts actors from a fresh search for a role with `traits`; existing rows
+        get the new stats and traits.
+        """
+        if self.min_candidates <= 0:
+            return
+        trait_key = f",{','.join(sorted(set(traits or [])))}," if traits else None
+        rows = {}
+        for actor in actors or []:
+            row = _clean(actor)
+            if row:
+                # One row per name: ON CONFLICT cannot touch the same row twice in a statement
+                rows[row["name"]] = {**row, "industry": industry, "gender": gender, "traits": trait_key,
+                                     "refreshed_at": datetime.now(timezone.utc)}
+        if not rows:
+            return
+        try:
+            async with self.session_factory() as db:
+                dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+                stmt = dialect.insert(Actor).values(list(rows.values()))
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["name", "industry"],
+                    set_={f: stmt.excluded[f] for f in (*_STAT_FIELDS, "gender", "traits", "refreshed_at")},
+                )
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            print(f"⚠️ Actor Catalog Upsert Error: {e}")
+
+
+actor_catalog = ActorCatalog(
+    AsyncSessionLocal,
+    min_candidates=settings.ACTOR_CATALOG_MIN_CANDIDATES,
+    max_age=settings.ACTOR_CATALOG_MAX_AGE,
+)
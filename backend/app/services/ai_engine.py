@@ -1,14 +1,18 @@
 import json
 import re
 import os
+import math
 import hashlib
 import asyncio
-import concurrent.futures
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from app.core.config import settings
 from app.core.cache import cache
+from app.core.singleflight import singleflight
+from app.core.metrics import STAGE_DURATION
+from app.core.tracing import current_span, span
+from app.services.llm_limiter import llm_limiter
+from app.services.actor_catalog import actor_catalog
+from app.services.actor_batch import ActorSearchBatcher, actor_batch_sizer
+from app.services.json_stream import JSONArrayStream
 
 def extract_json_from_text(text):
     """
@@ -33,21 +37,144 @@ def extract_json_from_text(text):
     
     return None
 
-class AIEngine:
+# Filler words dropped from role traits before building a cache signature
+_TRAIT_STOPWORDS = {
+    "a", "an", "and", "the", "of", "with", "in", "on", "to", "for", "who", "is", "but",
+    "very", "quite", "somewhat", "his", "her", "their", "at", "by", "as", "or",
+}
+_GENDER_ALIASES = {
+    "male": "male", "m": "male", "man": "male", "boy": "male",
+    "female": "female", "f": "female", "woman": "female", "girl": "female",
+}
+# Salary bands are log2 buckets: each band spans a factor of 2 (e.g. $2.1M-$4.2M)
+_SALARY_BAND_BASE = 2.0
+
+def _salary_band(amount):
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        return "x"
+    if amount <= 0:
+        return "0"
+    return str(math.floor(math.log(amount, _SALARY_BAND_BASE)))
+
+def role_gender(char) -> str:
+    return _GENDER_ALIASES.get(str(char.get('gender', '')).strip().lower(), "any")
+
+def _budget(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+def _allocation_matches(alloc, char) -> bool:
+    a = str(alloc.get('name', '')).lower()
+    c = str(char.get('name', '')).lower()
+    return bool(a and c) and (a in c or c in a)
+
+def role_traits(char) -> list:
+    """
+    Sorted trait tokens of a role, without filler words.
+    """
+    traits = char.get('traits', '')
+    if isinstance(traits, (list, tuple)):
+        traits = " ".join(str(t) for t in traits)
+    return sorted({t for t in re.findall(r"[a-z0-9]+", str(traits).lower()) if t not in _TRAIT_STOPWORDS})
+
+def role_signature(char, industry: str) -> str:
+    """
+    Normalized description of what an actor search is looking for.
+    Characters from different projects with the same signature share search results.
+    """
+    tokens = role_traits(char)
+    gender = role_gender(char)
+    band = f"{_salary_band(char.get('budget_min_display'))}-{_salary_band(char.get('budget_max_display'))}"
+    return "|".join([industry.lower(), gender, ",".join(tokens), band])
+
+class StageCacheStats:
+    """
+    Hit/miss counters per pipeline stage cache.
+    """
     def __init__(self):
+        self.counts = {}
+
+    def record(self, stage: str, hit: bool):
+        counts = self.counts.setdefault(stage, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+    def snapshot(self):
+        return {
+            stage: {**c, "hit_ratio": c["hits"] / (c["hits"] + c["misses"])}
+            for stage, c in self.counts.items()
+        }
+
+stage_cache_stats = StageCacheStats()
+
+def _chain(template: str, llm):
+    """
+    prompt | llm | str parser. langchain is imported on first use rather than
+    at startup, so processes that never call the LLM don't pay for it.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+    return ChatPromptTemplate.from_template(template) | llm | StrOutputParser()
+
+async def _no_emit(event, **data):
+    pass
+
+async def _no_checkpoint(state):
+    pass
+
+class AIEngine:
+    def __init__(self, llm=None, llm_search=None, catalog=None):
+        # Models and the actor catalog can be injected (e.g. offline fakes for benchmarks)
+        self.catalog = catalog or actor_catalog
+        if llm is None or llm_search is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
         # Fast model for logic/extraction
-        self.llm = ChatGoogleGenerativeAI(
+        self.llm = llm or ChatGoogleGenerativeAI(
             model="gemini-2.5-flash",
             temperature=0,
             google_api_key=settings.GOOGLE_API_KEY
         )
         # Grounded LLM for search (with Google Search Tool)
-        self.llm_search = ChatGoogleGenerativeAI(
+        self.llm_search = llm_search or ChatGoogleGenerativeAI(
             model="gemini-2.5-flash",
             temperature=0.1,
             google_api_key=settings.GOOGLE_API_KEY
         ).bind(tools=[{"google_search": {}}])
 
+    async def _stream_items(self, stage, chain, inputs, key=None, on_item=None, max_items=None):
+        """
+        Streams the chain's output through an incremental JSON parser so each object
+        of the response's list (the one under `key`) is available as soon as it closes,
+        and awaits `on_item` with it. Generation stops once `max_items` objects arrived.
+        Returns the objects and the raw text, for callers that need to fall back.
+        """
+        async def consume():
+            parser = JSONArrayStream(key)
+            items = []
+            stream = chain.astream(inputs)
+            try:
+                async for chunk in stream:
+                    for item in parser.feed(chunk):
+                        if max_items and len(items) >= max_items:
+                            break
+                        items.append(item)
+                        if on_item is not None:
+                            await on_item(item)
+                    if parser.done:
+                        break
+                    if max_items and len(items) >= max_items:
+                        current_span().set(stopped_early=True)
+                        break
+            finally:
+                # Closing the stream cancels the rest of the generation
+                await stream.aclose()
+            return items, parser.text
+
+        return await llm_limiter.run(stage, consume)
+
     async def extract_characters(self, plot: str):
         """
         Extracts character data from the plot.
@@ -58,137 +185,312 @@ class AIEngine:
         cache_key = f"chars:{plot_hash}"
         
         cached_data = await cache.get(cache_key)
+        stage_cache_stats.record("characters", bool(cached_data))
         if cached_data:
             print(f"⚡ Cache Hit: Characters for plot {plot_hash}")
+            current_span().set(cache="hit")
             return cached_data
+        current_span().set(cache="miss")
 
-        # 2. Run LLM if not in cache
-        print(f"🧠 AI: Extracting characters for plot {plot_hash}...")
-        prompt = ChatPromptTemplate.from_template(
-            "Extract main characters from this plot. Return JSON with key 'characters' (list of {{name, gender, age_range, traits}}). "
-            "Output ONLY raw JSON. Plot: {plot}"
-        )
-        chain = prompt | self.llm | StrOutputParser()
-        try:
-            res = await chain.ainvoke({"plot": plot})
-            data = extract_json_from_text(res)
-            
-            # 3. Save to Cache (Expire in 24 hours)
-            if data:
-                await cache.set(cache_key, data, expire=86400)
-                
-            return data
-        except Exception as e:
-            print(f"❌ Error extracting characters: {e}")
-            return None
+        # 2. Run LLM if not in cache; identical concurrent requests share one call
+        async def extract():
+            print(f"🧠 AI: Extracting characters for plot {plot_hash}...")
+            chain = _chain(
+                "Extract main characters from this plot. Return JSON with key 'characters' (list of {{name, gender, age_range, traits}}). "
+                "Output ONLY raw JSON. Plot: {plot}",
+                self.llm
+            )
+            try:
+                items, text = await self._stream_items("characters", chain, {"plot": plot}, key="characters")
+                return {"characters": items} if items else extract_json_from_text(text)
+            except Exception as e:
+                print(f"❌ Error extracting characters: {e}")
+                return None
+
+        # 3. Save to Cache (Expire in 24 hours)
+        return await singleflight.do(cache_key, extract, expire=86400)
 
-    async def allocate_budget(self, characters, total_budget, currency_symbol):
+    async def allocate_budget(self, characters, total_budget, currency_symbol, on_allocation=None):
         """
         Allocates the total budget across the identified characters.
+        `on_allocation(alloc)` is awaited for each allocation as it streams in
+        (not for cached results).
         """
         char_names = [c['name'] for c in characters]
-        prompt = ChatPromptTemplate.from_template(
-            f"You are a Movie Producer. The Total Budget is {currency_symbol}{{total_budget}}. "
-            f"Create a salary range (min and max) for these characters: {{char_names}} based on their importance. "
-            "Return ONLY a JSON object: {{ 'allocations': [ {{ 'name': 'Exact Char Name', 'min_budget': float, 'max_budget': float }} ] }} "
-        )
-        chain = prompt | self.llm | StrOutputParser()
-        try:
-            res = await chain.ainvoke({"total_budget": total_budget, "char_names": str(char_names)})
-            return extract_json_from_text(res)
-        except Exception as e:
-            print(f"❌ Error allocating budget: {e}")
-            return None
+        alloc_hash = hashlib.md5(f"{currency_symbol}|{total_budget}|{char_names}".encode()).hexdigest()
+        cache_key = f"alloc:{alloc_hash}"
 
-    def fetch_actor_sync(self, char, context_str, currency_instruction):
+        cached_data = await cache.get(cache_key)
+        stage_cache_stats.record("allocation", bool(cached_data))
+        current_span().set(cache="hit" if cached_data else "miss")
+        if cached_data:
+            return cached_data
+
+        async def allocate():
+            chain = _chain(
+                f"You are a Movie Producer. The Total Budget is {currency_symbol}{{total_budget}}. "
+                f"Create a salary range (min and max) for these characters: {{char_names}} based on their importance. "
+                "Return ONLY a JSON object: {{ 'allocations': [ {{ 'name': 'Exact Char Name', 'min_budget': float, 'max_budget': float }} ] }} ",
+                self.llm
+            )
+            try:
+                items, text = await self._stream_items(
+                    "allocation", chain, {"total_budget": total_budget, "char_names": str(char_names)},
+                    key="allocations", on_item=on_allocation, max_items=len(char_names)
+                )
+                return {"allocations": items} if items else extract_json_from_text(text)
+            except Exception as e:
+                print(f"❌ Error allocating budget: {e}")
+                return None
+
+        return await singleflight.do(cache_key, allocate, expire=86400)
+
+    async def fetch_actor(self, char, context_str, currency_instruction):
         """
-        Synchronous worker function to be run in a ThreadPool.
         Performs Google Search via Gemini to find matching actors.
+        Runs under the shared LLM limiter like every other stage.
         """
-        prompt = ChatPromptTemplate.from_template(
+        chain = _chain(
             f"You are a Casting Director for a {context_str} movie. "
             f"Role: {{name}} (Gender: {{gender}}). Traits: {{traits}}. "
             f"**Target Salary Range:** {{min_b}} - {{max_b}}. "
             f"SEARCH and suggest exactly 5 {{gender}} actors whose market rate falls roughly within this range. "
             f"For each actor, find their estimated salary per film ({currency_instruction}) and recent box office average. "
             "\n\nRETURN ONLY A RAW JSON LIST of objects: "
-            "[{{ 'name': 'Actor Name', 'salary': int (raw value), 'box_office': int (raw value), 'rating': float (1-10), 'versatility': int (1-100), 'risk': float (0.0-1.0) }}]"
+            "[{{ 'name': 'Actor Name', 'salary': int (raw value), 'box_office': int (raw value), 'rating': float (1-10), 'versatility': int (1-100), 'risk': float (0.0-1.0) }}]",
+            self.llm_search
         )
-        chain = prompt | self.llm_search | StrOutputParser()
+        inputs = {
+            "name": char['name'],
+            "gender": char.get('gender', 'Any'),
+            "traits": char['traits'],
+            "min_b": char.get('budget_min_display', 0),
+            "max_b": char.get('budget_max_display', 0)
+        }
         try:
-            res = chain.invoke({
-                "name": char['name'],
-                "gender": char.get('gender', 'Any'),
-                "traits": char['traits'],
-                "min_b": char.get('budget_min_display', 0),
-                "max_b": char.get('budget_max_display', 0)
-            })
-            data = extract_json_from_text(res)
-            return data if data else []
+            items, text = await self._stream_items("actors", chain, inputs, max_items=5)
+            data = items or extract_json_from_text(text)
+            # Only actor objects: anything else would be cached and break the optimizer
+            return [a for a in data if isinstance(a, dict)] if isinstance(data, list) else []
         except Exception as e:
             print(f"⚠️ Actor Search Failed for {char['name']}: {e}")
             return []
 
-    async def run_pipeline(self, plot: str, budget: float, industry: str):
+    async def fetch_actors_batch(self, chars, context_str, currency_instruction, on_role):
+        """
+        One grounded search for several roles at once.
+        `on_role(index, actors)` is awaited for each role's list as soon as it streams in.
+        """
+        chain = _chain(
+            f"You are a Casting Director for a {context_str} movie. "
+            "For EACH numbered role below, SEARCH and suggest exactly 5 actors of the role's gender "
+            "whose market rate falls roughly within the role's target salary range. "
+            f"For each actor, find their estimated salary per film ({currency_instruction}) and recent box office average."
+            "\n\nRoles:\n{roles}"
+            "\n\nRETURN ONLY A RAW JSON OBJECT: "
+            "{{ 'roles': [ {{ 'role': int (role number), 'actors': [{{ 'name': 'Actor Name', 'salary': int (raw value), 'box_office': int (raw value), 'rating': float (1-10), 'versatility': int (1-100), 'risk': float (0.0-1.0) }}] }} ] }}",
+            self.llm_search
+        )
+        roles = "\n".join(
+            f"{n}. {c['name']} (Gender: {c.get('gender', 'Any')}). Traits: {c.get('traits', '')}. "
+            f"**Target Salary Range:** {c.get('budget_min_display', 0)} - {c.get('budget_max_display', 0)}."
+            for n, c in enumerate(chars, 1)
+        )
+
+        async def on_item(item):
+            try:
+                index = int(item.get('role')) - 1
+            except (AttributeError, TypeError, ValueError):
+                return
+            if isinstance(item.get('actors'), list):
+                await on_role(index, [a for a in item['actors'] if isinstance(a, dict)])
+
+        items, text = await self._stream_items(
+            "actors_batch", chain, {"roles": roles}, key="roles", on_item=on_item, max_items=len(chars)
+        )
+        if not items:
+            data = extract_json_from_text(text)
+            items = data.get('roles', []) if isinstance(data, dict) else []
+            for item in items:
+                await on_item(item)
+        actor_batch_sizer.observe(len(text), len(items))
+
+    def actor_batcher(self, roles, context_str, currency_instruction):
+        """
+        Batches the actor searches of a pipeline with `roles` roles left to search.
+        """
+        return ActorSearchBatcher(
+            lambda chars, on_role: self.fetch_actors_batch(chars, context_str, currency_instruction, on_role),
+            lambda char: self.fetch_actor(char, context_str, currency_instruction),
+            batch_size=actor_batch_sizer.size_for(roles),
+            window=settings.ACTOR_SEARCH_BATCH_WINDOW,
+        )
+
+    async def run_pipeline(self, plot: str, budget: float, industry: str, emit=None, state=None, checkpoint=None):
         """
         Orchestrates the entire extraction -> budgeting -> scouting flow.
+        `emit(event, **data)` is awaited after each stage to report progress.
+        `state` holds the outputs of stages finished by an earlier run, which are
+        skipped; `checkpoint(state)` is awaited whenever a stage completes.
+        Actor searches that came back empty count as failed and are re-run.
         """
-        # 1. Extract Characters (Cached)
-        char_data = await self.extract_characters(plot)
-        if not char_data or 'characters' not in char_data:
-            raise ValueError("Failed to extract characters from plot.")
-        
-        characters = char_data['characters']
-        
-        # 2. Allocate Budget
-        symbol = "₹" if industry == "Bollywood" else "$"
-        alloc_data = await self.allocate_budget(characters, budget, symbol)
-        
-        allocations = alloc_data.get('allocations', []) if alloc_data else []
-        
-        # Merge Budget info into Character objects
-        final_chars = []
-        for char in characters:
-            # Try to find matching allocation
-            match = next((a for a in allocations if a['name'].lower() in char['name'].lower() or char['name'].lower() in a['name'].lower()), None)
-            
-            if match:
-                char['budget_min_display'] = match['min_budget']
-                char['budget_max_display'] = match['max_budget']
-            else:
-                # Fallback logic if AI missed a character
-                avg = budget / len(characters)
-                char['budget_min_display'] = avg * 0.5
-                char['budget_max_display'] = avg * 1.5
-            
-            final_chars.append(char)
-            
-        # 3. Parallel Actor Search
+        if emit is None:
+            emit = _no_emit
+        if state is None:
+            state = {}
+        if checkpoint is None:
+            checkpoint = _no_checkpoint
+
         context_str = "Bollywood" if industry == "Bollywood" else "Hollywood"
         currency_inst = "in raw INR" if industry == "Bollywood" else "in raw USD"
-        
-        print(f"🚀 Starting parallel search for {len(final_chars)} roles...")
-        
-        # Get the current running event loop to schedule blocking tasks
-        loop = asyncio.get_running_loop()
-        futures = []
-        
-        # Schedule synchronous search tasks in a ThreadPoolExecutor
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as pool:
-            for char in final_chars:
-                futures.append(
-                    loop.run_in_executor(
-                        pool, 
-                        self.fetch_actor_sync, 
-                        char, context_str, currency_inst
-                    )
+        found = state.setdefault('actors', {})
+        # Role index -> actor search already started while the allocation was still streaming
+        searches = {}
+
+        def actor_cache_key(char):
+            # Same role signature in any project (any user) reuses the search result
+            return f"actors:{hashlib.sha1(role_signature(char, context_str).encode()).hexdigest()}"
+
+        async def lookup(char):
+            # Enough fresh catalog actors found for similar roles in the budget range make the grounded search unnecessary
+            gender = role_gender(char)
+            traits = role_traits(char)
+            actors = await self.catalog.find(
+                context_str, gender,
+                _budget(char.get('budget_min_display'), 0.0),
+                _budget(char.get('budget_max_display'), float("inf")),
+                traits
+            )
+            stage_cache_stats.record("catalog", bool(actors))
+            current_span().set(source="catalog" if actors else "llm")
+            if actors:
+                return actors
+            actors = await batcher.fetch(char)
+            await self.catalog.record(actors, context_str, gender, traits)
+            return actors
+
+        async def search(i, char, cache_key, actors, total):
+            stage_cache_stats.record("actors", bool(actors))
+            with span("actor_search", role=char['name'], cache="hit" if actors else "miss") as s:
+                if not actors:
+                    # Coalesced onto an identical search elsewhere unless lookup() overrides this
+                    s.set(source="shared")
+                    with STAGE_DURATION.labels("actor_search").time():
+                        actors = await singleflight.do(cache_key, lambda: lookup(char), expire=settings.ACTOR_CACHE_TTL)
+                s.set(found=len(actors))
+            if actors:
+                found[str(i)] = actors
+                await checkpoint(state)
+            await emit("actor_search_done", role=char['name'], found=len(actors), total=total)
+
+        async def search_streamed(i, char, total):
+            cache_key = actor_cache_key(char)
+            await search(i, char, cache_key, await cache.get(cache_key), total)
+
+        try:
+            if 'roles' in state:
+                current_span().set(resumed_roles=len(state['roles']), resumed_searches=len(state.get('actors', {})))
+                print(f"⏩ Resuming pipeline: {len(state.get('actors', {}))}/{len(state['roles'])} actor searches done")
+                final_chars = state['roles']
+                batcher = self.actor_batcher(
+                    sum(1 for i in range(len(final_chars)) if not found.get(str(i))), context_str, currency_inst
                 )
-            
-            # Wait for all search tasks to complete
-            results_lists = await asyncio.gather(*futures)
-        
+                await emit("characters_extracted", characters=[c.get('name') for c in final_chars], resumed=True)
+            else:
+                # 1. Extract Characters (Cached)
+                if 'characters' in state:
+                    characters = state['characters']
+                else:
+                    with STAGE_DURATION.labels("extraction").time(), span("extraction"):
+                        char_data = await self.extract_characters(plot)
+                    if not char_data or 'characters' not in char_data:
+                        raise ValueError("Failed to extract characters from plot.")
+
+                    characters = char_data['characters']
+                    state['characters'] = characters
+                    await checkpoint(state)
+                await emit("characters_extracted", characters=[c.get('name') for c in characters])
+                # Searches from streamed allocations and the rest below share batches
+                batcher = self.actor_batcher(
+                    sum(1 for i in range(len(characters)) if not found.get(str(i))), context_str, currency_inst
+                )
+
+                def with_budget(char, match):
+                    char = dict(char)
+                    if match:
+                        char['budget_min_display'] = match['min_budget']
+                        char['budget_max_display'] = match['max_budget']
+                    else:
+                        # Fallback logic if AI missed a character
+                        avg = budget / len(characters)
+                        char['budget_min_display'] = avg * 0.5
+                        char['budget_max_display'] = avg * 1.5
+                    return char
+
+                # A role's actor search starts as soon as its allocation streams in.
+                # Allocations arrive in order, so the first one matching a role is
+                # the same one the merge below would pick.
+                streamed = {}
+
+                async def on_allocation(alloc):
+                    if 'min_budget' not in alloc or 'max_budget' not in alloc:
+                        return
+                    for i, char in enumerate(characters):
+                        if i in streamed or not _allocation_matches(alloc, char):
+                            continue
+                        streamed[i] = with_budget(char, alloc)
+                        if not found.get(str(i)):
+                            searches[i] = asyncio.create_task(search_streamed(i, streamed[i], len(characters)))
+
+                # 2. Allocate Budget
+                symbol = "₹" if industry == "Bollywood" else "$"
+                with STAGE_DURATION.labels("allocation").time(), span("allocation") as s:
+                    alloc_data = await self.allocate_budget(characters, budget, symbol, on_allocation=on_allocation)
+                    s.set(searches_started=len(searches))
+
+                allocations = alloc_data.get('allocations', []) if alloc_data else []
+
+                # Merge Budget info into Character objects
+                final_chars = []
+                for i, char in enumerate(characters):
+                    if i in streamed:
+                        final_chars.append(streamed[i])
+                        continue
+                    # Try to find matching allocation
+                    match = next((a for a in allocations if _allocation_matches(a, char)), None)
+                    final_chars.append(with_budget(char, match))
+
+                state['roles'] = final_chars
+                await checkpoint(state)
+
+            await emit("budget_allocated", allocations=[
+                {"name": c['name'], "min_budget": c['budget_min_display'], "max_budget": c['budget_max_display']}
+                for c in final_chars
+            ])
+
+            # 3. Parallel Actor Search (only roles without a successful or running search yet)
+            pending = [i for i in range(len(final_chars)) if not found.get(str(i)) and i not in searches]
+
+            print(f"🚀 Starting parallel search for {len(pending)} of {len(final_chars)} roles "
+                  f"({len(searches)} already started)...")
+
+            # The remaining roles are looked up in one batched cache round trip
+            cache_keys = [actor_cache_key(final_chars[i]) for i in pending]
+            with span("actor_cache_lookup", keys=len(cache_keys)) as s:
+                cached_actors = await cache.mget(cache_keys)
+                s.set(hits=sum(1 for a in cached_actors if a))
+
+            # All searches run together; the shared LLM limiter decides how many hit Gemini at once
+            await asyncio.gather(*searches.values(), *(
+                search(i, final_chars[i], key, actors, len(final_chars))
+                for i, key, actors in zip(pending, cache_keys, cached_actors)
+            ))
+        except BaseException:
+            for task in searches.values():
+                task.cancel()
+            raise
+
         # Attach results back to characters
-        for i, actors in enumerate(results_lists):
-            final_chars[i]['actors'] = actors
-            
-        return {"characters": final_chars}
\ No newline at end of file
+        return {"characters": [
+            {**char, 'actors': found.get(str(i), [])} for i, char in enumerate(final_chars)
+        ]}
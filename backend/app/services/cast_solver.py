@@ -0,0 +1,370 @@
+import heapq
+import itertools
+import numpy as np
+from dataclasses import dataclass
+
+# Feature layout shared by the solver and the RL environment
+FEATURES = ("salary", "box_office", "rating", "versatility", "risk")
+SALARY, BOX_OFFICE, RATING, VERSATILITY, RISK = range(len(FEATURES))
+
+
+@dataclass(frozen=True)
+class ScoreWeights:
+    """
+    Multipliers on the terms of the casting reward; all 1.0 is the standard reward.
+    Must be non-negative: the solver's bounds rely on the reward's monotonicity.
+    """
+    box_office: float = 1.0
+    rating: float = 1.0
+    versatility: float = 1.0
+    risk: float = 1.0
+    budget: float = 1.0  # Over-budget penalty
+
+
+DEFAULT_WEIGHTS = ScoreWeights()
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def build_feature_tensor(characters):
+    """
+    Packs the candidate actors of every character into one dense array.
+    Returns (features, mask): features is (characters x actors x 5) in FEATURES
+    order, mask flags which slots hold a real candidate.
+    """
+    num_chars = len(characters)
+    max_actors = max((len(c.get('actors') or []) for c in characters), default=0)
+    actors_per_char = max(max_actors, 1)  # Prevent 0
+
+    features = np.zeros((num_chars, actors_per_char, len(FEATURES)), dtype=np.float64)
+    mask = np.zeros((num_chars, actors_per_char), dtype=bool)
+
+    for c, char in enumerate(characters):
+        for a, actor in enumerate(char.get('actors') or []):
+            features[c, a] = [_as_float(actor.get(k, 0)) for k in FEATURES]
+            mask[c, a] = True
+
+    return features, mask
+
+
+def score_totals(salary, box_office, rating, versatility, risk, num_characters, budget_cap, weights=DEFAULT_WEIGHTS):
+    """
+    Casting reward computed from cast totals. Accepts scalars or NumPy arrays.
+    This is the single source of truth for CastingEnv and the exact solver.
+    """
+    n = max(num_characters, 1)
+    avg_rating = rating / n
+    avg_vers = versatility / n
+
+    final_bo = box_office * 0.7 * (1 + ((avg_rating - 7.0) * 0.1))
+
+    # Reward Function: Maximize BO, Rating, Versatility. Minimize Risk and Budget Overflow.
+    score = (weights.box_office * (final_bo / 1_000_000) + weights.rating * (avg_rating * 10)
+             + weights.versatility * (avg_vers * 0.5) - weights.risk * (risk * 50))
+
+    overflow = np.maximum(salary - budget_cap, 0)
+    return score - weights.budget * (overflow / 100_000)  # Heavy penalty
+
+
+def score_selection(features, indices, budget_cap, weights=DEFAULT_WEIGHTS):
+    """
+    Scores one cast given as an index vector (one actor slot per character).
+    """
+    totals = features[np.arange(len(indices)), indices].sum(axis=0)
+    return float(score_totals(*totals, len(indices), budget_cap, weights))
+
+
+@dataclass
+class CastSolution:
+    indices: np.ndarray
+    score: float
+    optimal: bool
+    nodes: int
+
+
+def _option_counts(mask):
+    # A character without candidates still takes the all-zero placeholder slot
+    return np.maximum(mask.sum(axis=1), 1)
+
+
+def _local_search(features, counts, budget_cap, weights):
+    """
+    Greedy start followed by coordinate ascent; seeds the branch-and-bound incumbent.
+    """
+    num_chars = features.shape[0]
+    indices = np.zeros(num_chars, dtype=np.int64)
+    totals = features[np.arange(num_chars), indices].sum(axis=0)
+
+    improved = True
+    while improved:
+        improved = False
+        for c in range(num_chars):
+            options = features[c, :counts[c]]
+            candidates = totals - features[c, indices[c]] + options
+            scores = score_totals(*candidates.T, num_chars, budget_cap, weights)
+            best = int(np.argmax(scores))
+            if scores[best] > scores[indices[c]] + 1e-9:
+                totals = candidates[best]
+                indices[c] = best
+                improved = True
+
+    return indices, float(score_totals(*totals, num_chars, budget_cap, weights))
+
+
+# Budget multipliers for the Lagrangian bound: penalty(S) >= mu * (S - cap) for mu in [0, 1]
+_PENALTY_MULTIPLIERS = (0.0, 0.5, 1.0)
+
+
+def solve_exact(features, mask, budget_cap, node_limit=None, weights=DEFAULT_WEIGHTS):
+    """
+    Best single cast; see solve_top_k.
+    """
+    return solve_top_k(features, mask, budget_cap, 1, node_limit, weights)[0]
+
+
+def solve_top_k(features, mask, budget_cap, k, node_limit=None, weights=DEFAULT_WEIGHTS):
+    """
+    Branch-and-bound over one pick per character, keeping the k best distinct
+    casts (highest score first). A subtree is pruned once its bound cannot
+    beat the k-th best cast found so far.
+
+    Two upper bounds are combined for every subtree. The reward is bilinear in
+    (box office, rating) and monotone in the other totals, so the four corners
+    of the optimistic remaining totals bound it. When box office and rating are
+    non-negative, fixing the box office multiplier at its largest reachable
+    value and relaxing the budget penalty to a linear term also bounds it, and
+    that relaxation separates per character. If node_limit is hit the best casts
+    found so far are returned with optimal=False. `weights` scale the reward's
+    terms; the bounds scale with them.
+    """
+    num_chars = features.shape[0]
+    if num_chars == 0:
+        return [CastSolution(np.zeros(0, dtype=np.int64), 0.0, True, 0)]
+    k = max(int(k), 1)
+
+    counts = _option_counts(mask)
+    n = num_chars
+
+    # Branch on the widest choices first so bounds tighten early
+    order = np.argsort(-counts, kind="stable")
+    ordered = features[order]
+    valid = np.arange(features.shape[1])[None, :] < counts[order][:, None]
+    options = [ordered[p, :counts[c]] for p, c in enumerate(order)]
+
+    # Suffix sums of per-character minimum and maximum of every feature
+    suffix_lo = np.zeros((num_chars + 1, len(FEATURES)))
+    suffix_hi = np.zeros((num_chars + 1, len(FEATURES)))
+    for p in range(num_chars - 1, -1, -1):
+        suffix_lo[p] = suffix_lo[p + 1] + options[p].min(axis=0)
+        suffix_hi[p] = suffix_hi[p + 1] + options[p].max(axis=0)
+
+    # Coefficients of score_totals expanded as a*BO*R + b*BO + c*R + d*V - e*risk - penalty
+    coef_bo_r = weights.box_office * 0.7 * 0.1 / (1_000_000 * n)
+    coef_bo = weights.box_office * 0.7 * (1 - 0.7) / 1_000_000
+    coef_r = weights.rating * 10 / n
+    coef_v = weights.versatility * 0.5 / n
+    coef_risk = weights.risk * 50
+    coef_penalty = weights.budget / 100_000
+    separable = bool((ordered[..., BOX_OFFICE][valid] >= 0).all() and (ordered[..., RATING][valid] >= 0).all())
+    linear_parts = []
+    for mu in _PENALTY_MULTIPLIERS:
+        part = (coef_v * ordered[..., VERSATILITY]
+                - coef_risk * ordered[..., RISK] - mu * coef_penalty * ordered[..., SALARY])
+        linear_parts.append(np.where(valid, part, -np.inf))
+    box_offices = np.where(valid, ordered[..., BOX_OFFICE], 0.0)
+    ratings = np.where(valid, ordered[..., RATING], 0.0)
+
+    def upper_bound(totals, p):
+        lo = totals + suffix_lo[p]
+        hi = totals + suffix_hi[p]
+        if not separable:
+            bound = None
+            for bo in (lo[:, BOX_OFFICE], hi[:, BOX_OFFICE]):
+                for rating in (lo[:, RATING], hi[:, RATING]):
+                    s = score_totals(lo[:, SALARY], bo, rating, hi[:, VERSATILITY], lo[:, RISK], n, budget_cap, weights)
+                    bound = s if bound is None else np.maximum(bound, s)
+            return bound
+
+        # McCormick over-estimators of BO*R on the reachable box, each linear per character
+        envelopes = (
+            (hi[:, RATING], lo[:, BOX_OFFICE], -hi[:, RATING] * lo[:, BOX_OFFICE]),
+            (lo[:, RATING], hi[:, BOX_OFFICE], -lo[:, RATING] * hi[:, BOX_OFFICE]),
+        )
+        bound = np.full(len(totals), np.inf)
+        for bo_weight, r_weight, offset in envelopes:
+            w_bo = coef_bo_r * bo_weight + coef_bo
+            w_r = coef_bo_r * r_weight + coef_r
+            fixed = (w_bo * totals[:, BOX_OFFICE] + w_r * totals[:, RATING] + coef_bo_r * offset
+                     + coef_v * totals[:, VERSATILITY] - coef_risk * totals[:, RISK])
+            for mu, part in zip(_PENALTY_MULTIPLIERS, linear_parts):
+                rest = w_bo[:, None, None] * box_offices[None, p:] + w_r[:, None, None] * ratings[None, p:] + part[None, p:]
+                relaxed = fixed - mu * coef_penalty * (totals[:, SALARY] - budget_cap) + rest.max(axis=2).sum(axis=1)
+                bound = np.minimum(bound, relaxed)
+        return bound
+
+    # Min-heap of (score, tiebreak, picks in branching order) holding the k best casts
+    best = []
+    held = set()
+    tiebreak = itertools.count()
+
+    def offer(score, picks):
+        key = picks.tobytes()
+        if key in held:
+            return
+        entry = (score, next(tiebreak), picks.copy())
+        if len(best) < k:
+            heapq.heappush(best, entry)
+        else:
+            held.discard(heapq.heapreplace(best, entry)[2].tobytes())
+        held.add(key)
+
+    seed_indices, seed_score = _local_search(features, counts, budget_cap, weights)
+    offer(seed_score, seed_indices[order])
+    choice = np.zeros(num_chars, dtype=np.int64)
+    nodes = 0
+    truncated = False
+
+    def visit(p, totals):
+        nonlocal nodes, truncated
+        nodes += 1
+        if node_limit and nodes > node_limit:
+            truncated = True
+            return
+
+        children = totals + options[p]
+        if p + 1 == num_chars:
+            # Leaf: score the picks exactly
+            bounds = score_totals(*children.T, n, budget_cap, weights)
+        else:
+            bounds = upper_bound(children, p + 1)
+        for j in np.argsort(-bounds, kind="stable"):
+            if truncated:
+                break
+            if len(best) == k:
+                cutoff = best[0][0]
+                if bounds[j] <= cutoff + 1e-9 * max(1.0, abs(cutoff)):
+                    break
+            choice[p] = j
+            if p + 1 == num_chars:
+                offer(float(bounds[j]), choice)
+            else:
+                visit(p + 1, children[j])
+
+    visit(0, np.zeros(len(FEATURES)))
+
+    solutions = []
+    for score, _, picks in sorted(best, key=lambda entry: (-entry[0], entry[1])):
+        indices = np.zeros(num_chars, dtype=np.int64)
+        indices[order] = picks
+        solutions.append(CastSolution(indices, score, not truncated, nodes))
+    return solutions
+
+
+# Pareto objectives, all minimized: total salary, negated box office, total risk
+_PARETO_SIGNS = np.array([1.0, -1.0, 1.0])
+_PARETO_FEATURES = [SALARY, BOX_OFFICE, RISK]
+
+
+def _nondominated(points, chunk=256):
+    """
+    Indices of the distinct rows of `points` that no other row dominates
+    (<= in every column, < in one). Rows are sorted lexicographically, so only
+    an earlier row can dominate a later one and it already wins on the first
+    column; the remaining columns are compared block by block, vectorized.
+    """
+    _, first = np.unique(points, axis=0, return_index=True)
+    ordered = points[first]
+    keep = np.ones(len(ordered), dtype=bool)
+    for start in range(0, len(ordered), chunk):
+        stop = min(start + chunk, len(ordered))
+        rival_rows = np.flatnonzero(keep[:stop])
+        dominated = rival_rows[None, :] < np.arange(start, stop)[:, None]
+        for col in range(1, points.shape[1]):
+            dominated &= ordered[rival_rows, col][None, :] <= ordered[start:stop, col][:, None]
+        keep[start:stop] = ~dominated.any(axis=1)
+    return first[keep]
+
+
+def _thin(points, max_points):
+    """
+    Epsilon-box thinning: splits the normalized objective space into a grid and
+    keeps the point nearest the ideal corner in every occupied cell, coarsening
+    the grid until at most max_points remain.
+    """
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    norm = (points - lo) / np.where(hi > lo, hi - lo, 1.0)
+    closeness = norm.sum(axis=1)
+    bins = max(int(np.sqrt(max_points)), 2)
+    while True:
+        cells = np.minimum((norm * bins).astype(np.int64), bins - 1)
+        cell_ids = (cells[:, 0] * bins + cells[:, 1]) * bins + cells[:, 2]
+        order = np.lexsort((closeness, cell_ids))
+        _, first = np.unique(cell_ids[order], return_index=True)
+        chosen = order[first]
+        if len(chosen) <= max_points or bins == 2:
+            return chosen
+        bins = max(int(bins * 0.8), 2)
+
+
+def pareto_front(features, mask, max_points=1000):
+    """
+    Casts not dominated on (total salary, total box office, total risk): no other
+    cast is at most as expensive and as risky with at least as much box office.
+
+    Built one character at a time. The objectives are sums over characters, so a
+    partial cast dominated by another can never complete into a non-dominated
+    cast, and dominated partial casts are dropped after every character. If the
+    partial front grows past max_points it is thinned to one cast per epsilon-box
+    and the result is an approximation (exact=False).
+    Returns (totals, indices, exact): totals is (m x 3) salary, box office, risk
+    sorted by salary; indices is (m x characters) actor slots.
+    """
+    counts = _option_counts(mask)
+    num_chars = features.shape[0]
+    points = np.zeros((1, len(_PARETO_FEATURES)))
+    picks = np.zeros((1, num_chars), dtype=np.int64)
+    exact = True
+
+    for c in range(num_chars):
+        options = features[c, :counts[c]][:, _PARETO_FEATURES] * _PARETO_SIGNS
+        points = (points[:, None, :] + options[None, :, :]).reshape(-1, len(_PARETO_FEATURES))
+        picks = np.repeat(picks, counts[c], axis=0)
+        picks[:, c] = np.tile(np.arange(counts[c]), len(picks) // counts[c])
+
+        keep = _nondominated(points)
+        points, picks = points[keep], picks[keep]
+        if len(points) > max_points:
+            keep = _thin(points, max_points)
+            points, picks = points[keep], picks[keep]
+            exact = False
+
+    order = np.lexsort((points[:, 2], points[:, 1], points[:, 0]))
+    return points[order] * _PARETO_SIGNS, picks[order], exact
+
+
+def build_cast(characters, indices):
+    """
+    Converts per-character actor indices into the optimization_result payload.
+    """
+    final_cast = []
+    for char, idx in zip(characters, indices):
+        actors = char.get('actors') or []
+        if actors:
+            act_idx = int(idx) if idx < len(actors) else 0
+            sel = actors[act_idx]
+            final_cast.append({
+                "role": char['name'],
+                "actor_name": sel['name'],
+                "salary": sel.get('salary', 0),
+                "box_office": sel.get('box_office', 0),
+                "rating": sel.get('rating', 0),
+                "risk": sel.get('risk', 0)
+            })
+        else:
+            final_cast.append({"role": char['name'], "actor_name": "No Candidate Found", "salary": 0})
+    return final_cast
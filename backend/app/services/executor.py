@@ -0,0 +1,110 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.core.config import settings
+
+
+class OptimizerQueueFull(RuntimeError):
+    pass
+
+
+def _init_worker(torch_threads: int):
+    """
+    Runs once in every pool process. Caps BLAS/OpenMP threads so N workers
+    don't oversubscribe the CPU cores shared with the API. torch is not
+    imported here: exact-solver jobs never need it, and the PPO path caps
+    torch's own thread pools when it loads (rl_optimizer).
+    """
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(torch_threads)
+
+
+class OptimizationExecutor:
+    """
+    Process pool for CPU-bound optimization jobs with a bounded wait queue.
+    At most `max_workers` jobs run at once; up to `max_queue` more may wait
+    for a slot, anything beyond that is rejected with OptimizerQueueFull.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, torch_threads: int):
+        self.max_workers = max(max_workers, 1)
+        self.max_queue = max_queue
+        self.torch_threads = torch_threads
+        self._pool = None
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            # 'spawn' keeps torch/OpenMP state from being forked out of the API process
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.torch_threads,),
+            )
+        return self._pool
+
+    async def run(self, fn, *args):
+        """
+        Runs fn(*args) in the pool without blocking the event loop.
+        fn and its arguments must be picklable (module-level function, plain data).
+        """
+        if self.queued >= self.max_queue:
+            raise OptimizerQueueFull(f"Optimization queue is full ({self.max_queue} waiting)")
+
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        pool = self._get_pool()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(pool, fn, *args)
+            self.completed += 1
+            return result
+        except BrokenProcessPool:
+            # A pool process died (e.g. OOM-killed): replace the pool for later calls
+            self.failed += 1
+            if self._pool is pool:
+                self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queued,
+            "queue_limit": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    async def shutdown(self):
+        if self._pool is None:
+            return
+        pool, self._pool = self._pool, None
+        # Drop queued work, let running jobs finish, without blocking the loop
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+
+optimizer_executor = OptimizationExecutor(
+    max_workers=settings.OPTIMIZER_WORKERS,
+    max_queue=settings.OPTIMIZER_MAX_QUEUE,
+    torch_threads=settings.OPTIMIZER_TORCH_THREADS,
+)
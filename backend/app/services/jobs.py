@@ -0,0 +1,152 @@
+import json
+import random
+import time
+from typing import Optional
+from app.core.config import settings
+from app.core.cache import cache
+
+QUEUE_KEY = "jobs:queue"            # LIST of ready payloads
+PROCESSING_KEY = "jobs:processing"  # LIST of payloads claimed by a worker
+LEASES_KEY = "jobs:leases"          # ZSET payload -> visibility deadline
+DELAYED_KEY = "jobs:delayed"        # ZSET payload -> retry time
+LOCK_PREFIX = "jobs:lock:"          # Per-project lock, prevents double execution
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def encode_job(project_id: int, attempt: int = 0) -> str:
+    return json.dumps({"project_id": project_id, "attempt": attempt}, sort_keys=True)
+
+
+def decode_job(payload) -> dict:
+    return json.loads(_text(payload))
+
+
+class JobQueue:
+    """
+    Durable project job queue on Redis (reliable-queue pattern).
+
+    Jobs move atomically from the ready list to a processing list when claimed
+    and hold a lease until acked. Expired leases (crashed or stuck workers), jobs
+    claimed by a worker that died before leasing them, and due retries are moved
+    back to the ready list by `maintain()`, which every worker runs periodically.
+    """
+
+    def __init__(self, redis_client, visibility_timeout: int = 600, max_attempts: int = 3,
+                 retry_backoff: float = 5.0):
+        self.redis = redis_client
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._unleased = set()  # Processing payloads without a lease at the last maintain()
+
+    async def enqueue(self, project_id: int, attempt: int = 0):
+        await self.redis.lpush(QUEUE_KEY, encode_job(project_id, attempt))
+
+    async def claim(self, timeout: float = 1.0) -> Optional[str]:
+        """
+        Blocks up to `timeout` seconds for a job and leases it to the caller.
+        """
+        payload = await self.redis.blmove(QUEUE_KEY, PROCESSING_KEY, timeout, "RIGHT", "LEFT")
+        if payload is None:
+            return None
+        payload = _text(payload)
+        await self.redis.zadd(LEASES_KEY, {payload: time.time() + self.visibility_timeout})
+        return payload
+
+    async def extend_lease(self, payload: str):
+        await self.redis.zadd(LEASES_KEY, {payload: time.time() + self.visibility_timeout}, xx=True)
+
+    async def ack(self, payload: str):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.lrem(PROCESSING_KEY, 1, payload)
+        pipe.zrem(LEASES_KEY, payload)
+        await pipe.execute()
+
+    async def retry(self, payload: str) -> bool:
+        """
+        Acks a failed job and schedules the next attempt with jittered exponential
+        backoff. Returns False when the job is out of attempts.
+        """
+        job = decode_job(payload)
+        await self.ack(payload)
+        attempt = job["attempt"] + 1
+        if attempt >= self.max_attempts:
+            return False
+
+        delay = self.retry_backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+        await self.redis.zadd(DELAYED_KEY, {encode_job(job["project_id"], attempt): time.time() + delay})
+        return True
+
+    async def defer(self, payload: str, delay: float):
+        """
+        Acks a job and re-offers it after `delay` seconds without using up an attempt.
+        """
+        await self.ack(payload)
+        await self.redis.zadd(DELAYED_KEY, {payload: time.time() + delay})
+
+    async def maintain(self):
+        """
+        Promotes due retries and re-queues jobs whose lease expired or was never
+        taken. ZREM/LREM decide which worker wins when several run this at once.
+        """
+        now = time.time()
+        for payload in await self.redis.zrangebyscore(DELAYED_KEY, "-inf", now):
+            if await self.redis.zrem(DELAYED_KEY, payload):
+                await self.redis.lpush(QUEUE_KEY, payload)
+
+        for payload in await self.redis.zrangebyscore(LEASES_KEY, "-inf", now):
+            if await self.redis.zrem(LEASES_KEY, payload):
+                await self.redis.lrem(PROCESSING_KEY, 1, payload)
+                job = decode_job(payload)
+                print(f"⏱️ [Jobs] Lease expired for project {job['project_id']}, re-queueing.")
+                await self.redis.lpush(QUEUE_KEY, encode_job(job["project_id"], job["attempt"] + 1))
+
+        # BLMOVE and the lease ZADD are separate commands (a blocking pop can't run in a
+        # script or MULTI), so a worker dying in between leaves a job processing with no
+        # lease. A live claim leases within milliseconds: reap ones still unleased a pass later.
+        processing = {_text(p) for p in await self.redis.lrange(PROCESSING_KEY, 0, -1)}
+        leased = {_text(p) for p in await self.redis.zrange(LEASES_KEY, 0, -1)}
+        unleased = processing - leased
+        for payload in unleased & self._unleased:
+            if await self.redis.zscore(LEASES_KEY, payload) is None and await self.redis.lrem(PROCESSING_KEY, 1, payload):
+                job = decode_job(payload)
+                print(f"⏱️ [Jobs] Project {job['project_id']} was claimed but never leased, re-queueing.")
+                await self.redis.lpush(QUEUE_KEY, encode_job(job["project_id"], job["attempt"] + 1))
+        self._unleased = unleased - self._unleased
+
+    async def acquire_project_lock(self, project_id: int) -> bool:
+        return bool(await self.redis.set(f"{LOCK_PREFIX}{project_id}", "1", nx=True, ex=self.visibility_timeout))
+
+    async def refresh_project_lock(self, project_id: int):
+        await self.redis.expire(f"{LOCK_PREFIX}{project_id}", self.visibility_timeout)
+
+    async def release_project_lock(self, project_id: int):
+        await self.redis.delete(f"{LOCK_PREFIX}{project_id}")
+
+    async def known_project_ids(self) -> set:
+        """
+        Project ids currently ready, processing or waiting for a retry.
+        """
+        payloads = await self.redis.lrange(QUEUE_KEY, 0, -1)
+        payloads += await self.redis.lrange(PROCESSING_KEY, 0, -1)
+        payloads += await self.redis.zrange(DELAYED_KEY, 0, -1)
+        return {decode_job(p)["project_id"] for p in payloads}
+
+    async def depth(self) -> dict:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.llen(QUEUE_KEY)
+        pipe.llen(PROCESSING_KEY)
+        pipe.zcard(DELAYED_KEY)
+        ready, processing, delayed = await pipe.execute()
+        return {"ready": ready, "processing": processing, "delayed": delayed}
+
+
+job_queue = JobQueue(
+    cache.redis,
+    visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF,
+)
@@ -0,0 +1,91 @@
+import json
+import re
+from typing import Optional
+
+
+class JSONArrayStream:
+    """
+    Incremental parser for LLM output that contains a JSON list of objects.
+
+    feed() takes raw text chunks as they stream in and returns each element
+    object of the target array as soon as its closing brace arrives. The target
+    array is the first one whose key is `key` (e.g. "characters"), or the first
+    array in the text when `key` is None, that holds objects: an array whose
+    first element is not an object, or that closes without yielding one (e.g. a
+    citation like "[1]" in prose), is passed over. Markdown fences and conversational
+    filler around the JSON are skipped naturally, since only brackets and
+    strings are tracked.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self._key_pattern = re.compile(rf'"{re.escape(key)}"\s*:\s*$') if key else None
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None  # Depth inside the target array once it has opened
+        self._awaiting_first = False  # Target array opened, first element not seen yet
+        self._array_items = 0  # Objects yielded by the current target array
+        self._item_start = None
+        self.done = False  # Target array closed
+        self.skipped = 0  # Elements that closed but were not valid JSON
+
+    def feed(self, chunk: str):
+        self.text += chunk
+        items = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            if self.done:
+                break
+            ch = text[i]
+            if self._awaiting_first:
+                if ch.isspace():
+                    continue
+                self._awaiting_first = False
+                if ch != "{":
+                    self._array_depth = None
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if self._array_depth is None:
+                    if ch == "[" and self._is_target(i):
+                        self._array_depth = self._depth
+                        self._awaiting_first = True
+                        self._array_items = 0
+                elif ch == "{" and self._depth == self._array_depth + 1:
+                    self._item_start = i
+            elif ch in "}]":
+                self._depth -= 1
+                if self._array_depth is None:
+                    continue
+                if ch == "}" and self._item_start is not None and self._depth == self._array_depth:
+                    try:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                        self._array_items += 1
+                    except json.JSONDecodeError:
+                        self.skipped += 1
+                    self._item_start = None
+                elif ch == "]" and self._depth == self._array_depth - 1:
+                    if self._array_items:
+                        self.done = True
+                    else:
+                        self._array_depth = None
+        self._pos = len(text)
+        return items
+
+    def _is_target(self, i: int) -> bool:
+        if self._key_pattern is None:
+            return True
+        return bool(self._key_pattern.search(self.text[max(0, i - 200):i]))
@@ -0,0 +1,146 @@
+import asyncio
+import random
+import time
+from app.core.config import settings
+from app.core.metrics import LLM_CALLS, LLM_LATENCY
+from app.core.tracing import span
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """
+    Gemini surfaces quota errors as google.api_core ResourceExhausted (HTTP 429)
+    or wrapped in a generic error whose message mentions the status.
+    """
+    name = type(exc).__name__
+    message = str(exc).lower()
+    return (
+        name in ("ResourceExhausted", "TooManyRequests", "RateLimitError")
+        or "429" in message
+        or "resource exhausted" in message
+        or "rate limit" in message
+    )
+
+
+class TokenBucket:
+    """
+    Refills `rate` tokens per second up to `capacity`; acquire() waits for one token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return  # Unlimited
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class LLMLimiter:
+    """
+    Process-wide gate for every LLM call: at most `max_in_flight` concurrent
+    requests, `requests_per_minute` throttling, and jittered exponential retry
+    when the provider answers with a rate-limit error.
+    """
+
+    def __init__(self, max_in_flight: int, requests_per_minute: int, max_retries: int, retry_base_delay: float):
+        self.max_in_flight = max(max_in_flight, 1)
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._bucket = TokenBucket(requests_per_minute / 60.0, capacity=min(self.max_in_flight, max(requests_per_minute, 1)))
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.queue_delay_total = 0.0
+        self.queue_delay_max = 0.0
+        self.stages = {}
+
+    async def run(self, stage: str, call):
+        """
+        Awaits `call()` (a zero-argument coroutine factory) under the shared limits.
+        """
+        with span("llm", stage=stage) as s:
+            return await self._run(stage, call, s)
+
+    async def _run(self, stage: str, call, s):
+        queued_total = 0.0
+        for attempt in range(self.max_retries + 1):
+            queued_at = time.monotonic()
+            self.waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self.waiting -= 1
+            try:
+                await self._bucket.acquire()
+                queue_delay = time.monotonic() - queued_at
+                self._record_queue_delay(stage, queue_delay)
+                queued_total += queue_delay
+                s.set(attempts=attempt + 1, queue_ms=round(queued_total * 1000, 2))
+                self.in_flight += 1
+                self.calls += 1
+                started = time.perf_counter()
+                try:
+                    result = await call()
+                finally:
+                    self.in_flight -= 1
+                    LLM_LATENCY.labels(stage).observe(time.perf_counter() - started)
+                LLM_CALLS.labels(stage, "ok").inc()
+                return result
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    self.errors += 1
+                    LLM_CALLS.labels(stage, "error").inc()
+                    raise
+                self.rate_limited += 1
+                LLM_CALLS.labels(stage, "rate_limited").inc()
+            finally:
+                self._slots.release()
+
+            # Full jitter keeps retries from concurrent requests from re-colliding
+            delay = random.uniform(0, self.retry_base_delay * (2 ** attempt))
+            print(f"⏳ LLM rate limited ({stage}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _record_queue_delay(self, stage: str, delay: float):
+        self.queue_delay_total += delay
+        self.queue_delay_max = max(self.queue_delay_max, delay)
+        stats = self.stages.setdefault(stage, {"calls": 0, "queue_delay_total": 0.0})
+        stats["calls"] += 1
+        stats["queue_delay_total"] += delay
+
+    def stats(self):
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "queue_delay_avg": self.queue_delay_total / self.calls if self.calls else 0.0,
+            "queue_delay_max": self.queue_delay_max,
+            "stages": self.stages,
+        }
+
+
+llm_limiter = LLMLimiter(
+    max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    max_retries=settings.LLM_MAX_RETRIES,
+    retry_base_delay=settings.LLM_RETRY_BASE_DELAY,
+)
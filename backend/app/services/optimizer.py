@@ -0,0 +1,123 @@
+import numpy as np
+from app.core.config import settings
+from app.services.cast_solver import (
+    BOX_OFFICE, DEFAULT_WEIGHTS, RISK, SALARY, build_cast, build_feature_tensor, pareto_front, solve_exact, solve_top_k,
+)
+
+def run_exact_optimization(casting_data: dict, budget_cap: float):
+    """
+    Solves the casting problem with branch-and-bound over the same reward
+    as CastingEnv. Deterministic and typically finishes in milliseconds.
+    """
+    characters = casting_data['characters']
+    features, mask = build_feature_tensor(characters)
+    solution = solve_exact(features, mask, budget_cap, node_limit=settings.OPTIMIZER_NODE_LIMIT)
+    if not solution.optimal:
+        print(f"⚠️ Optimizer node limit reached after {solution.nodes} nodes, returning best cast found.")
+    return build_cast(characters, solution.indices)
+
+def _alternative(characters, features, indices, **extra):
+    """
+    Compact summary of one cast: its totals and the chosen actor per character
+    (None for a character without candidates).
+    """
+    totals = features[np.arange(len(indices)), indices].sum(axis=0)
+    actors = [
+        char['actors'][int(idx)].get('name') if char.get('actors') else None
+        for char, idx in zip(characters, indices)
+    ]
+    return {
+        **extra,
+        "total_salary": float(totals[SALARY]),
+        "total_box_office": float(totals[BOX_OFFICE]),
+        "total_risk": float(totals[RISK]),
+        "actors": actors,
+    }
+
+def _spread(count: int, limit: int):
+    # Evenly spaced positions, so a cost-sorted front keeps its cheapest and dearest ends
+    return np.unique(np.linspace(0, count - 1, min(count, limit)).round().astype(int))
+
+def run_frontier_optimization(casting_data: dict, budget_cap: float):
+    """
+    Best cast plus alternatives: the OPTIMIZER_TOP_K highest-scoring casts and
+    up to OPTIMIZER_PARETO_POINTS casts from the salary / box office / risk
+    Pareto front, cheapest first. Alternatives list one actor name per
+    character, in the order of `cast`.
+    """
+    characters = casting_data['characters']
+    features, mask = build_feature_tensor(characters)
+    solutions = solve_top_k(features, mask, budget_cap, settings.OPTIMIZER_TOP_K, node_limit=settings.OPTIMIZER_NODE_LIMIT)
+    if not solutions[0].optimal:
+        print(f"⚠️ Optimizer node limit reached after {solutions[0].nodes} nodes, returning best casts found.")
+    totals, picks, exact = pareto_front(features, mask, settings.OPTIMIZER_PARETO_MAX_FRONTIER)
+
+    return {
+        "cast": build_cast(characters, solutions[0].indices),
+        "optimal": solutions[0].optimal,
+        "top_k": [
+            _alternative(characters, features, s.indices, rank=rank, score=s.score)
+            for rank, s in enumerate(solutions, start=1)
+        ],
+        "pareto": [
+            _alternative(characters, features, picks[i], within_budget=bool(totals[i, 0] <= budget_cap))
+            for i in _spread(len(picks), settings.OPTIMIZER_PARETO_POINTS)
+        ],
+        "pareto_exact": exact,
+    }
+
+def run_optimization(casting_data: dict, budget_cap: float):
+    """
+    Picks one actor per character. OPTIMIZER_MODE selects the exact solver
+    (default), the exact solver with top-K and Pareto alternatives
+    ('frontier', the result is then a dict with the cast under 'cast') or the
+    legacy PPO agent.
+    Lives apart from rl_optimizer so the default path never imports
+    gymnasium / stable_baselines3 / torch.
+    """
+    if settings.OPTIMIZER_MODE == "ppo":
+        from app.services.rl_optimizer import run_ppo_optimization
+        return run_ppo_optimization(casting_data, budget_cap)
+    if settings.OPTIMIZER_MODE == "frontier":
+        return run_frontier_optimization(casting_data, budget_cap)
+    return run_exact_optimization(casting_data, budget_cap)
+
+def _actor_key(actor) -> str:
+    return str(actor.get('name', '')).strip().casefold()
+
+def apply_constraints(characters, locked=None, excluded=None):
+    """
+    Candidate lists narrowed for a what-if run: `excluded` actor names are dropped
+    from every role, and a role in `locked` (role name -> actor name) keeps only
+    that actor. Raises ValueError for a lock on an unknown role or unavailable actor.
+    """
+    excluded = {name.strip().casefold() for name in excluded or []}
+    locked = locked or {}
+    unknown = set(locked) - {c['name'] for c in characters}
+    if unknown:
+        raise ValueError(f"Unknown roles: {', '.join(sorted(unknown))}")
+
+    narrowed = []
+    for char in characters:
+        actors = [a for a in char.get('actors') or [] if _actor_key(a) not in excluded]
+        if char['name'] in locked:
+            wanted = locked[char['name']].strip().casefold()
+            actors = [a for a in actors if _actor_key(a) == wanted][:1]
+            if not actors:
+                raise ValueError(f"'{locked[char['name']]}' is not an available candidate for {char['name']}")
+        narrowed.append({**char, 'actors': actors})
+    return narrowed
+
+def run_what_if(characters, budget_cap: float, weights=DEFAULT_WEIGHTS):
+    """
+    Re-optimizes stored candidates (narrowed by apply_constraints) under a new
+    budget cap and reward weights. Always uses the exact solver: no LLM calls,
+    no training, typically milliseconds.
+    """
+    features, mask = build_feature_tensor(characters)
+    solution = solve_exact(features, mask, budget_cap, node_limit=settings.OPTIMIZER_NODE_LIMIT, weights=weights)
+    return {
+        "cast": build_cast(characters, solution.indices),
+        "score": solution.score,
+        "optimal": solution.optimal,
+    }
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import time
+from typing import Optional
+from app.core.cache import cache
+
+CHANNEL_PREFIX = "progress:"          # Pub/sub channel per project: progress:{id}
+HISTORY_PREFIX = "progress:history:"  # LIST of events already published for a project
+HISTORY_TTL = 3600
+TERMINAL_EVENTS = ("completed", "failed")
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+async def publish(project_id: int, event: str, **data):
+    """
+    Publishes a pipeline stage event for a project. Never raises: progress
+    reporting must not fail the pipeline it reports on.
+    """
+    if not cache.breaker.allow():
+        return
+    message = json.dumps({"event": event, "project_id": project_id, "ts": time.time(), **data})
+    try:
+        pipe = cache.redis.pipeline(transaction=False)
+        pipe.rpush(f"{HISTORY_PREFIX}{project_id}", message)
+        pipe.expire(f"{HISTORY_PREFIX}{project_id}", HISTORY_TTL)
+        pipe.publish(f"{CHANNEL_PREFIX}{project_id}", message)
+        await pipe.execute()
+        cache.breaker.record_success()
+    except Exception as e:
+        cache.breaker.record_failure()
+        print(f"⚠️ Progress Publish Error: {e}")
+
+
+async def reset(project_id: int):
+    """
+    Drops a project's event history, e.g. before a retry re-runs the pipeline.
+    """
+    if not cache.breaker.allow():
+        return
+    try:
+        await cache.redis.delete(f"{HISTORY_PREFIX}{project_id}")
+    except Exception as e:
+        cache.breaker.record_failure()
+        print(f"⚠️ Progress Reset Error: {e}")
+
+
+class ProgressHub:
+    """
+    Fans Redis pub/sub progress events out to in-process subscribers.
+    One pattern subscription per API process serves every open stream. If the
+    connection drops, the listener reconnects with backoff and replays each open
+    stream's history, so events published meanwhile (terminal ones included)
+    still arrive; streams drop the repeats.
+    """
+
+    def __init__(self, redis_client, max_backoff: float = 30.0):
+        self.redis = redis_client
+        self.max_backoff = max_backoff
+        self._subscribers = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()  # Set while the pattern subscription is live
+
+    async def _listen(self):
+        backoff = 0.5
+        reconnect = False
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                self._ready.set()
+                if reconnect:
+                    await self._replay()
+                backoff = 0.5
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    channel = _text(message["channel"])
+                    project_id = int(channel[len(CHANNEL_PREFIX):])
+                    for queue in self._subscribers.get(project_id, ()):
+                        queue.put_nowait(_text(message["data"]))
+            except Exception as e:
+                self._ready.clear()
+                cache.breaker.record_failure()
+                print(f"⚠️ Progress Listener Error: {e}, reconnecting in {backoff:.1f}s")
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+            reconnect = True
+
+    async def _replay(self):
+        # Events published while disconnected are only in the history lists
+        for project_id, queues in list(self._subscribers.items()):
+            for message in await cache.get_list(f"{HISTORY_PREFIX}{project_id}"):
+                for queue in list(queues):
+                    queue.put_nowait(_text(message))
+
+    def _ensure_listener(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def subscribe(self, project_id: int, heartbeat: float = 15.0):
+        """
+        Yields the project's events (history first, then live) until a terminal
+        event. Yields None every `heartbeat` seconds of silence.
+        """
+        self._ensure_listener()
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(project_id, set()).add(queue)
+        try:
+            # History is read once the pattern subscription is live, so nothing is missed in
+            # between. If Redis is unreachable, the listener replays history when it reconnects.
+            if cache.breaker.allow():
+                try:
+                    await asyncio.wait_for(self._ready.wait(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    pass
+            seen = set()
+            for message in await cache.get_list(f"{HISTORY_PREFIX}{project_id}"):
+                message = _text(message)
+                seen.add(message)
+                yield message
+                if json.loads(message)["event"] in TERMINAL_EVENTS:
+                    return
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message in seen:
+                    continue
+                seen.add(message)
+                yield message
+                if json.loads(message)["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            subscribers = self._subscribers.get(project_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[project_id]
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        self._ready.clear()
+
+
+progress_hub = ProgressHub(cache.redis)
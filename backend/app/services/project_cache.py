@@ -0,0 +1,53 @@
+import hashlib
+from app.core.cache import cache
+from app.core.config import settings
+from app.schemas.project import ProjectResponse
+
+# Pre-serialized GET /api/projects/{id} bodies of completed projects.
+# Stored as b'<etag>\n<json body>'. Keyed by the project's result_version and
+# only read after the caller checked the project still exists with that version,
+# so a delete that never reached Redis (breaker open, Redis error) or another
+# process's L1 cannot resurrect a deleted project or an outdated cast. That makes
+# the body safe to keep in L1 too; invalidate() is cleanup.
+KEY_PREFIX = "project:"
+
+
+def _key(project_id: int, user_id: str, version) -> str:
+    return f"{KEY_PREFIX}{user_id}:{project_id}:v{version or 0}"
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def get_body(project_id: int, user_id: str, version):
+    """
+    Returns (etag, body) for a cached completed project at `version`, or None.
+    """
+    data = await cache.get(_key(project_id, user_id, version))
+    if not data:
+        return None
+    etag, body = data.split(b"\n", 1)
+    return etag.decode(), body
+
+
+async def put_body(project_id: int, user_id: str, project):
+    """
+    Serializes a completed project once and caches the body. Returns (etag, body).
+    """
+    body = ProjectResponse.model_validate(project).model_dump_json().encode()
+    etag = make_etag(body)
+    await cache.set(_key(project_id, user_id, project.result_version), etag.encode() + b"\n" + body,
+                    expire=settings.PROJECT_CACHE_TTL)
+    return etag, body
+
+
+async def invalidate(project_id: int, user_id: str, version):
+    await cache.delete(_key(project_id, user_id, version))
@@ -0,0 +1,119 @@
+import hashlib
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update
+from app.core.config import settings
+from app.models.project import Project
+from app.services import progress
+
+
+def project_fingerprint(plot: str, budget: float, industry: str) -> str:
+    """
+    Content address of a submission. Plots that differ only in case, Unicode
+    form or whitespace, and budgets that differ below a cent, share a fingerprint.
+    """
+    text = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", plot or "")).strip().casefold()
+    key = "|".join([text, f"{float(budget):.2f}", (industry or "").strip().casefold()])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+async def find_source(db, fingerprint: str):
+    """
+    Most recent project with this fingerprint whose result can be shared: a
+    completed one younger than PROJECT_REUSE_MAX_AGE, else one still running.
+    Returns None when reuse is disabled or nothing matches.
+    """
+    if settings.PROJECT_REUSE_MAX_AGE <= 0:
+        return None
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.PROJECT_REUSE_MAX_AGE)
+    result = await db.execute(
+        select(Project)
+        .where(Project.fingerprint == fingerprint, Project.status == "completed", Project.created_at >= cutoff)
+        .order_by(Project.created_at.desc())
+        .limit(1)
+    )
+    source = result.scalars().first()
+    if source:
+        return source
+
+    # Followers wait on their own source, so only projects that run a pipeline can be joined
+    result = await db.execute(
+        select(Project)
+        .where(Project.fingerprint == fingerprint, Project.status == "pending", Project.reused_from.is_(None))
+        .order_by(Project.created_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+def adopt(project, source):
+    """
+    Links `project` to `source`: copies the result if the source is completed,
+    otherwise leaves the project pending until the source finishes.
+    """
+    project.reused_from = source.id
+    if source.status == "completed":
+        project.raw_characters = source.raw_characters
+        project.optimization_result = source.optimization_result
+        project.status = "completed"
+
+
+async def complete_followers(db, source):
+    """
+    Copies a freshly completed result into every project still waiting on it.
+    """
+    result = await db.execute(
+        update(Project)
+        .where(Project.reused_from == source.id, Project.status == "pending")
+        .values(
+            raw_characters=source.raw_characters,
+            optimization_result=source.optimization_result,
+            status="completed",
+        )
+        .returning(Project.id)
+    )
+    follower_ids = list(result.scalars().all())
+    await db.commit()
+    for project_id in follower_ids:
+        await progress.publish(project_id, "completed", reused_from=source.id)
+    return follower_ids
+
+
+async def reassign_followers(db, source_id: int):
+    """
+    Hands the projects waiting on a source that is being deleted to the oldest
+    of them, which has to run the pipeline itself; the rest now wait on it.
+    Returns its id (to dispatch once the caller commits), or None.
+    """
+    result = await db.execute(
+        select(Project.id)
+        .where(Project.reused_from == source_id, Project.status == "pending")
+        .order_by(Project.created_at, Project.id)
+    )
+    follower_ids = list(result.scalars().all())
+    if not follower_ids:
+        return None
+    heir, rest = follower_ids[0], follower_ids[1:]
+    await db.execute(update(Project).where(Project.id == heir).values(reused_from=None))
+    if rest:
+        await db.execute(update(Project).where(Project.id.in_(rest)).values(reused_from=heir))
+    return heir
+
+
+async def fail_followers(db, source_id: int, error: str = ""):
+    """
+    Fails the projects waiting on a failed source; each can be retried on its own.
+    """
+    result = await db.execute(
+        update(Project)
+        .where(Project.reused_from == source_id, Project.status == "pending")
+        .values(status="failed")
+        .returning(Project.id)
+    )
+    follower_ids = list(result.scalars().all())
+    await db.commit()
+    for project_id in follower_ids:
+        await progress.publish(project_id, "failed", error=error, reused_from=source_id)
+    return follower_ids
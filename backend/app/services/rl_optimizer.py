@@ -1,24 +1,43 @@
+import os
 import numpy as np
+import torch
 import gymnasium as gym
 from gymnasium import spaces
 from stable_baselines3 import PPO
+from app.services.cast_solver import FEATURES, build_cast, build_feature_tensor, score_totals
+# Re-exported for callers that predate app.services.optimizer
+from app.services.optimizer import run_exact_optimization, run_optimization
+
+# Optimizer pool processes set OMP_NUM_THREADS (executor._init_worker) but no longer
+# import torch up front, so torch's own thread pools are capped when PPO first loads
+if os.environ.get("OMP_NUM_THREADS"):
+    try:
+        torch.set_num_threads(int(os.environ["OMP_NUM_THREADS"]))
+        torch.set_num_interop_threads(int(os.environ["OMP_NUM_THREADS"]))
+    except (RuntimeError, ValueError):
+        pass  # Interop pool already started, or not a number
 
 class CastingEnv(gym.Env):
     def __init__(self, data, budget_cap):
         super(CastingEnv, self).__init__()
         self.data = data
         self.num_characters = len(data['characters'])
-        
-        # Calculate max actors found for any role to set action space
-        max_actors = 0
-        for c in data['characters']:
-            if len(c['actors']) > max_actors:
-                max_actors = len(c['actors'])
-        
-        self.actors_per_char = max(max_actors, 1) # Prevent 0
         self.budget_cap = budget_cap 
+
+        # Dense (characters x actors x 5) features, built once. The extra all-zero
+        # row is the terminal observation so every obs is a view into this array.
+        features, self.mask = build_feature_tensor(data['characters'])
+        self.actors_per_char = features.shape[1]
+        self.features = np.zeros((self.num_characters + 1,) + features.shape[1:], dtype=np.float64)
+        self.features[:self.num_characters] = features
+        self._flat_obs = self.features.reshape(self.num_characters + 1, -1)
+
+        # Characters without candidates still take the all-zero placeholder slot 0
+        self.option_counts = np.maximum(self.mask.sum(axis=1), 1)
+        self._char_range = np.arange(self.num_characters)
+
         self.current_char_idx = 0
-        self.selections = []
+        self.actions = np.zeros(self.num_characters, dtype=np.int64)
 
         # Action: Which actor index to pick for current character
         self.action_space = spaces.Discrete(self.actors_per_char)
@@ -31,46 +50,33 @@ class CastingEnv(gym.Env):
             dtype=np.float64
         )
 
-    def _get_obs(self):
-        if self.current_char_idx >= self.num_characters:
-            return np.zeros(self.observation_space.shape, dtype=np.float64)
-
-        char_data = self.data['characters'][self.current_char_idx]
-        actors = char_data['actors']
-        
-        obs = []
-        for i in range(self.actors_per_char):
-            if i < len(actors):
-                a = actors[i]
-                obs.extend([
-                    a.get('salary', 0), 
-                    a.get('box_office', 0), 
-                    a.get('rating', 0), 
-                    a.get('versatility', 0),
-                    a.get('risk', 0)
-                ])
+    @property
+    def selections(self):
+        """
+        Actor dicts picked so far (placeholder dict for roles without candidates).
+        """
+        picked = []
+        for c in range(self.current_char_idx):
+            actors = self.data['characters'][c]['actors']
+            if actors:
+                picked.append(actors[self.actions[c]])
             else:
-                obs.extend([0, 0, 0, 0, 0]) 
-        return np.array(obs, dtype=np.float64)
+                picked.append({'salary': 0, 'box_office': 0, 'rating': 0, 'versatility': 0, 'risk': 0, 'name': 'Unknown'})
+        return picked
+
+    def _get_obs(self):
+        return self._flat_obs[min(self.current_char_idx, self.num_characters)]
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
         self.current_char_idx = 0
-        self.selections = []
+        self.actions[:] = 0
         return self._get_obs(), {}
 
     def step(self, action):
-        current_char = self.data['characters'][self.current_char_idx]
-        valid_actors = current_char['actors']
-        
-        if len(valid_actors) > 0:
-            act_idx = int(action) if action < len(valid_actors) else 0
-            selected_actor = valid_actors[act_idx]
-        else:
-            # Fallback placeholder
-            selected_actor = {'salary': 0, 'box_office': 0, 'rating': 0, 'versatility': 0, 'risk': 0, 'name': 'Unknown'}
-
-        self.selections.append(selected_actor)
+        c = self.current_char_idx
+        act_idx = int(action)
+        self.actions[c] = act_idx if act_idx < self.option_counts[c] else 0
         self.current_char_idx += 1
         
         terminated = (self.current_char_idx >= self.num_characters)
@@ -84,26 +90,25 @@ class CastingEnv(gym.Env):
         return obs, reward, terminated, truncated, {}
 
     def _calculate_final_reward(self):
-        total_salary = sum(a.get('salary', 0) for a in self.selections)
-        avg_rating = np.mean([a.get('rating', 0) for a in self.selections]) if self.selections else 0
-        avg_vers = np.mean([a.get('versatility', 0) for a in self.selections]) if self.selections else 0
-        total_risk = sum(a.get('risk', 0) for a in self.selections)
-        
-        raw_bo = sum(a.get('box_office', 0) for a in self.selections)
-        final_bo = raw_bo * 0.7 * (1 + ((avg_rating - 7.0) * 0.1))
-        
-        SCALAR = 1000 # Normalized scalar
-        
-        # Reward Function: Maximize BO, Rating, Versatility. Minimize Risk and Budget Overflow.
-        score = (final_bo / 1_000_000) + (avg_rating * 10) + (avg_vers * 0.5) - (total_risk * 50)
+        totals = self.features[self._char_range, self.actions].sum(axis=0)
+        return float(score_totals(*totals, self.num_characters, self.budget_cap))
 
-        if total_salary > self.budget_cap:
-            overflow = total_salary - self.budget_cap
-            score -= (overflow / 100_000) # Heavy penalty
-            
-        return score
+    def evaluate(self, actions_matrix):
+        """
+        Scores many candidate casts at once.
+        actions_matrix is (num_casts x num_characters) actor indices; out-of-range
+        picks fall back to slot 0 exactly like step(). Returns a (num_casts,) array.
+        """
+        actions = np.asarray(actions_matrix, dtype=np.int64).reshape(-1, self.num_characters)
+        actions = np.where(actions < self.option_counts, actions, 0)
 
-def run_optimization(casting_data: dict, budget_cap: float):
+        # Accumulate per character so memory stays (num_casts x 5)
+        totals = np.zeros((actions.shape[0], len(FEATURES)), dtype=np.float64)
+        for c in range(self.num_characters):
+            totals += self.features[c, actions[:, c]]
+        return score_totals(*totals.T, self.num_characters, self.budget_cap)
+
+def run_ppo_optimization(casting_data: dict, budget_cap: float):
     """
     Trains a PPO agent ad-hoc for this specific casting problem.
     """
@@ -116,31 +121,12 @@ def run_optimization(casting_data: dict, budget_cap: float):
     # Infer
     obs, _ = env.reset()
     done = False
-    final_cast = []
+    actions = []
     
     # The environment tracks the char index, so we just step through
     while not done:
         action, _ = model.predict(obs)
-        
-        # Capture the logic before stepping
-        char_idx = env.current_char_idx
-        if char_idx < len(casting_data['characters']):
-            char = casting_data['characters'][char_idx]
-            actors = char['actors']
-            if actors:
-                act_idx = int(action) if action < len(actors) else 0
-                sel = actors[act_idx]
-                final_cast.append({
-                    "role": char['name'],
-                    "actor_name": sel['name'],
-                    "salary": sel.get('salary', 0),
-                    "box_office": sel.get('box_office', 0),
-                    "rating": sel.get('rating', 0),
-                    "risk": sel.get('risk', 0)
-                })
-            else:
-                 final_cast.append({"role": char['name'], "actor_name": "No Candidate Found", "salary": 0})
-
+        actions.append(int(action))
         obs, _, done, _, _ = env.step(action)
         
-    return final_cast
\ No newline at end of file
+    return build_cast(casting_data['characters'], actions)
@@ -1,46 +1,153 @@
 import asyncio
+import copy
+from functools import partial
+from sqlalchemy import exists, select
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.project import Project
+from app.core.config import settings
+from app.core.metrics import STAGE_DURATION
+from app.core.tracing import record_trace, span
 from app.services.ai_engine import AIEngine
-from app.services.rl_optimizer import run_optimization
+from app.services.optimizer import run_optimization
+from app.services.executor import optimizer_executor
+from app.services import progress, reuse
 from app.db.session import AsyncSessionLocal
 
-ai_engine = AIEngine()
+# Built on first use: API processes that only enqueue never create the LLM clients
+ai_engine = None
 
-async def process_project_background(project_id: int):
+def get_ai_engine() -> AIEngine:
+    global ai_engine
+    if ai_engine is None:
+        ai_engine = AIEngine()
+    return ai_engine
+
+async def execute_project(project_id: int):
     """
-    Runs the AI pipeline and RL optimization in the background.
-    Updates the DB status when finished.
+    Runs the AI pipeline and RL optimization for one project and stores the result.
+    Raises on failure so the caller decides between retrying and failing the project.
     """
     async with AsyncSessionLocal() as db:
-        try:
-            # 1. Fetch Project
-            project = await db.get(Project, project_id)
-            if not project: return
-
-            # 2. Run AI Extraction & Search
-            print(f"🔄 [Task] Starting AI Pipeline for Project {project_id}...")
-            pipeline_data = await ai_engine.run_pipeline(project.plot, project.budget_cap, project.industry)
-            
-            # 3. Run RL Optimization
-            print(f"🧠 [Task] Starting RL Optimization for Project {project_id}...")
-            # Note: run_optimization is synchronous (CPU bound), so we might want to wrap it if it blocks too long,
-            # but for this scale, direct call is fine in background thread.
-            final_cast = run_optimization(pipeline_data, project.budget_cap)
-            
-            # 4. Update DB
-            project.raw_characters = pipeline_data
-            project.optimization_result = final_cast
-            project.status = "completed"
-            
-            db.add(project)
+        # 1. Fetch Project
+        project = await db.get(Project, project_id)
+        if not project or project.status != "pending":
+            return  # Deleted, or already finished by another attempt
+        if project.reused_from is not None and await _follow_source(db, project):
+            return  # Result copied from, or still coming from, an identical submission
+
+        with record_trace() as trace:
+            try:
+                with span("project", project_id=project_id):
+                    await _run_project(db, project)
+            except Exception as e:
+                await save_trace(project_id, trace.to_dict("error", str(e)))
+                raise
+            await save_trace(project_id, trace.to_dict("ok"))
+
+async def _follow_source(db, project) -> bool:
+    """
+    Resolves a project attached to an identical submission. Returns False when
+    the source is gone or failed, so the project has to run its own pipeline.
+    """
+    source = await db.get(Project, project.reused_from)
+    if source and source.status == "pending":
+        return True
+    if source and source.status == "completed":
+        reuse.adopt(project, source)
+        await db.commit()
+        await progress.publish(project.id, "completed", reused_from=source.id)
+        return True
+    project.reused_from = None
+    await db.commit()
+    return False
+
+async def _run_project(db, project):
+    project_id = project.id
+
+    # 2. Run AI Extraction & Search, resuming from the last checkpoint
+    print(f"🔄 [Task] Starting AI Pipeline for Project {project_id}...")
+    emit = partial(progress.publish, project_id)
+    state = copy.deepcopy(project.pipeline_state or {})
+    checkpoint_lock = asyncio.Lock()
+
+    async def checkpoint(state):
+        # Searches finish concurrently; commits on the shared session must not interleave
+        async with checkpoint_lock:
+            project.pipeline_state = copy.deepcopy(state)
             await db.commit()
-            print(f"✅ [Task] Project {project_id} Completed Successfully.")
 
-        except Exception as e:
-            print(f"❌ [Task] Project {project_id} Failed: {e}")
+    with span("pipeline"):
+        pipeline_data = await get_ai_engine().run_pipeline(
+            project.plot, project.budget_cap, project.industry,
+            emit=emit, state=state, checkpoint=checkpoint
+        )
+    
+    # 3. Run RL Optimization
+    print(f"🧠 [Task] Starting RL Optimization for Project {project_id}...")
+    # CPU bound: runs in the optimizer process pool so the event loop stays free
+    with STAGE_DURATION.labels("optimization").time(), span("optimization", roles=len(pipeline_data['characters'])):
+        final_cast = await optimizer_executor.run(run_optimization, pipeline_data, project.budget_cap)
+    await emit("optimization_done")
+    
+    # 4. Update DB
+    project.raw_characters = pipeline_data
+    project.optimization_result = final_cast
+    project.status = "completed"
+    project.pipeline_state = None
+    
+    with span("save"):
+        db.add(project)
+        await db.commit()
+        # Identical submissions that attached to this run finish with it
+        followers = await reuse.complete_followers(db, project)
+    await emit("completed")
+    if followers:
+        print(f"♻️ [Task] Project {project_id} result copied to {len(followers)} identical submissions.")
+    print(f"✅ [Task] Project {project_id} Completed Successfully.")
+
+async def save_trace(project_id: int, attempt: dict):
+    """
+    Appends one attempt's trace to the project, keeping the most recent few.
+    Never raises: tracing must not change the outcome it records.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
             project = await db.get(Project, project_id)
             if project:
-                project.status = "failed"
-                db.add(project)
-                await db.commit()
\ No newline at end of file
+                project.trace = ((project.trace or []) + [attempt])[-settings.TRACE_MAX_ATTEMPTS:]
+                await db.commit()
+    except Exception as e:
+        print(f"⚠️ Trace Save Error for Project {project_id}: {e}")
+
+async def mark_project_failed(project_id: int, error: str = ""):
+    async with AsyncSessionLocal() as db:
+        project = await db.get(Project, project_id)
+        if project:
+            project.status = "failed"
+            db.add(project)
+            await db.commit()
+        # Also when the project was deleted mid-run: its followers must not stay pending
+        await reuse.fail_followers(db, project_id, error)
+    await progress.publish(project_id, "failed", error=error)
+
+async def find_pending_project_ids(created_before):
+    async with AsyncSessionLocal() as db:
+        # Projects waiting on a still-running identical submission are not lost, just attached
+        source = aliased(Project)
+        waiting = exists().where(source.id == Project.reused_from, source.status == "pending")
+        result = await db.execute(
+            select(Project.id).where(Project.status == "pending", Project.created_at < created_before, ~waiting)
+        )
+        return list(result.scalars().all())
+
+async def process_project_background(project_id: int):
+    """
+    Runs the AI pipeline and RL optimization in the background.
+    Updates the DB status when finished.
+    """
+    try:
+        await execute_project(project_id)
+    except Exception as e:
+        print(f"❌ [Task] Project {project_id} Failed: {e}")
+        await mark_project_failed(project_id, str(e))
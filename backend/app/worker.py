@@ -0,0 +1,155 @@
+"""
+Standalone job worker. Runs project pipelines pulled from the Redis job queue.
+
+Usage:  python -m app.worker
+Scale by running more worker processes; API processes only enqueue.
+Workers load the LLM stack at startup; the API (app.main) never imports it
+unless it has to run a project in-process.
+"""
+import asyncio
+import signal
+from datetime import datetime, timedelta, timezone
+from prometheus_client import start_http_server
+from app.core.config import settings
+from app.core.cache import cache
+from app.core.metrics import register_process_stats, set_job_queue_depth
+from app.db.schema import sync_schema
+from app.db.session import engine
+from app.services.executor import optimizer_executor
+from app.services.llm_limiter import llm_limiter
+from app.services.jobs import decode_job, job_queue
+from app.services import progress
+from app.services.runner import execute_project, find_pending_project_ids, get_ai_engine, mark_project_failed
+
+
+class Worker:
+    def __init__(self, queue, concurrency: int):
+        self.queue = queue
+        self.concurrency = max(concurrency, 1)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._tasks = set()
+        self._stopping = asyncio.Event()
+
+    async def recover_pending(self):
+        """
+        Re-enqueues 'pending' projects that no queue structure knows about,
+        e.g. jobs lost when the API ran them in-process and restarted.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_RECOVERY_GRACE)
+        known = await self.queue.known_project_ids()
+        recovered = 0
+        for project_id in await find_pending_project_ids(cutoff):
+            if project_id not in known:
+                await self.queue.enqueue(project_id)
+                recovered += 1
+        if recovered:
+            print(f"♻️ [Worker] Re-queued {recovered} stuck pending project(s).")
+
+    async def _keep_lease(self, payload: str, project_id: int):
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            await self.queue.extend_lease(payload)
+            await self.queue.refresh_project_lock(project_id)
+
+    async def handle(self, payload: str):
+        job = decode_job(payload)
+        project_id = job["project_id"]
+        try:
+            if job["attempt"] >= self.queue.max_attempts:
+                print(f"❌ [Worker] Project {project_id} exhausted {self.queue.max_attempts} attempts.")
+                await mark_project_failed(project_id, "Retry limit reached")
+                await self.queue.ack(payload)
+                return
+
+            if not await self.queue.acquire_project_lock(project_id):
+                # Another worker is running this project; look again once it is done
+                await self.queue.defer(payload, settings.JOB_MAINTENANCE_INTERVAL)
+                return
+
+            keeper = asyncio.create_task(self._keep_lease(payload, project_id))
+            try:
+                await execute_project(project_id)
+                await self.queue.ack(payload)
+            except Exception as e:
+                if await self.queue.retry(payload):
+                    print(f"⚠️ [Worker] Project {project_id} attempt {job['attempt'] + 1} failed, retrying: {e}")
+                    await progress.publish(project_id, "retrying", attempt=job['attempt'] + 1, error=str(e))
+                else:
+                    print(f"❌ [Worker] Project {project_id} Failed: {e}")
+                    await mark_project_failed(project_id, str(e))
+            finally:
+                keeper.cancel()
+                await self.queue.release_project_lock(project_id)
+        finally:
+            self._slots.release()
+
+    async def _maintenance_loop(self):
+        while not self._stopping.is_set():
+            try:
+                await self.queue.maintain()
+                set_job_queue_depth(await self.queue.depth())
+            except Exception as e:
+                print(f"⚠️ [Worker] Maintenance Error: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=settings.JOB_MAINTENANCE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self):
+        await self.recover_pending()
+        maintenance = asyncio.create_task(self._maintenance_loop())
+        print(f"👷 [Worker] Started with concurrency {self.concurrency}.")
+
+        while not self._stopping.is_set():
+            await self._slots.acquire()
+            if self._stopping.is_set():
+                self._slots.release()
+                break
+            try:
+                payload = await self.queue.claim(timeout=1)
+            except Exception as e:
+                print(f"⚠️ [Worker] Claim Error: {e}")
+                payload = None
+                await asyncio.sleep(1)
+            if payload is None:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self.handle(payload))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        # Drain: let running jobs finish, unclaimed jobs stay in Redis
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        maintenance.cancel()
+
+    def stop(self):
+        self._stopping.set()
+
+
+async def main():
+    async with engine.begin() as conn:
+        await conn.run_sync(sync_schema)
+    # The API imports the LLM stack lazily; a worker pays for it up front instead of in its first job
+    get_ai_engine()
+
+    if settings.WORKER_METRICS_PORT:
+        register_process_stats(cache, engine, llm_limiter, optimizer_executor)
+        start_http_server(settings.WORKER_METRICS_PORT)
+        print(f"📈 [Worker] Metrics on :{settings.WORKER_METRICS_PORT}/metrics")
+
+    worker = Worker(job_queue, settings.WORKER_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await optimizer_executor.shutdown()
+        await cache.close()
+        await engine.dispose()
+        print("👋 [Worker] Stopped.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
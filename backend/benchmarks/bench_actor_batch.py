@@ -0,0 +1,78 @@
+"""
+Per-role vs batched actor search: end-to-end run_pipeline latency, LLM calls
+and approximate token usage for scripts with a growing number of roles.
+
+The fake LLM charges a fixed latency per call plus a latency per 1000
+response characters, so a batch pays one round trip but a longer response.
+Caches are cold and the actor catalog is disabled, so every role is searched.
+
+Run from backend/:  python -m benchmarks.bench_actor_batch [--roles 4 8 12] [--latency 0.3]
+Requires fakeredis (benchmarks/requirements.txt).
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+
+import fakeredis
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.services.actor_batch import actor_batch_sizer
+from app.services.actor_catalog import ActorCatalog
+from app.services.ai_engine import AIEngine
+from benchmarks.common import percentiles, write_results
+from benchmarks.fake_llm import FakeChatModel
+
+CHARS_PER_TOKEN = 4  # Rough average for English prose and JSON
+
+
+async def run_mode(batch_size, roles, repeat, latency, latency_per_kchar):
+    actor_batch_sizer.max_roles = batch_size
+    actor_batch_sizer.chars_per_role = 0.0
+    durations = []
+    llm = FakeChatModel(latency=latency, latency_per_kchar=latency_per_kchar, roles=roles, calls=[])
+    engine = AIEngine(llm=llm, llm_search=llm, catalog=ActorCatalog(None, min_candidates=0, max_age=0))
+    for n in range(repeat):
+        # Cold caches: only the actor search differs between modes
+        cache.redis = fakeredis.aioredis.FakeRedis()
+        cache.local.clear()
+        start = time.perf_counter()
+        result = await engine.run_pipeline(f"Script {roles}-{n}: a heist goes wrong.", 60_000_000, "Hollywood")
+        durations.append(time.perf_counter() - start)
+        assert all(c["actors"] for c in result["characters"]), "role without actors"
+
+    search_calls = [c for c in llm.calls if "Casting Director" in c]
+    return {
+        "batch_size": batch_size,
+        "pipeline": percentiles(durations),
+        "llm_calls": len(llm.calls) / repeat,
+        "search_calls": len(search_calls) / repeat,
+        "prompt_tokens": llm.prompt_chars / CHARS_PER_TOKEN / repeat,
+        "response_tokens": llm.response_chars / CHARS_PER_TOKEN / repeat,
+    }
+
+
+async def main(role_counts, repeat, latency, latency_per_kchar):
+    results = {"latency_s": latency, "latency_per_kchar_s": latency_per_kchar, "cases": []}
+    for roles in role_counts:
+        per_role = await run_mode(1, roles, repeat, latency, latency_per_kchar)
+        batched = await run_mode(settings.ACTOR_SEARCH_BATCH_SIZE, roles, repeat, latency, latency_per_kchar)
+        results["cases"].append({"roles": roles, "per_role": per_role, "batched": batched})
+        print(f"{roles:>3} roles: per-role p50={per_role['pipeline']['p50_ms']:.0f} ms, "
+              f"{per_role['search_calls']:.0f} searches, {per_role['prompt_tokens'] + per_role['response_tokens']:.0f} tokens | "
+              f"batched p50={batched['pipeline']['p50_ms']:.0f} ms, "
+              f"{batched['search_calls']:.0f} searches, {batched['prompt_tokens'] + batched['response_tokens']:.0f} tokens")
+    write_results("actor_batch", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, nargs="+", default=[4, 8, 12])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.3, help="Fixed seconds per fake LLM call")
+    parser.add_argument("--latency-per-kchar", type=float, default=0.02, help="Seconds per 1000 response characters")
+    args = parser.parse_args()
+    asyncio.run(main(args.roles, args.repeat, args.latency, args.latency_per_kchar))
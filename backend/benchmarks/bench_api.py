@@ -0,0 +1,182 @@
+"""
+Offline load test of the project API: concurrent users POST /api/projects/run
+and poll GET /api/projects/{id} until their project completes. Then what-if
+re-optimizations of a completed project go through POST /api/projects/{id}/reoptimize.
+
+Everything runs in one process: the FastAPI app over httpx's ASGI transport,
+SQLite, fakeredis, a FakeClerkIssuer for auth, FakeChatModel behind AIEngine
+and an in-process app.worker.Worker consuming the job queue.
+
+Run from backend/:  python -m benchmarks.bench_api [--levels 1 4 16] [--projects 3] [--llm-latency 0.05]
+Requires fakeredis and aiosqlite (benchmarks/requirements.txt).
+"""
+import argparse
+import asyncio
+import os
+import time
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "results", "bench_api.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{DB_PATH}")
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+os.environ.setdefault("JOB_BACKEND", "redis")
+
+import fakeredis
+import httpx
+
+from app.core import security
+from app.core.cache import cache
+from app.core.config import settings
+from app.db.schema import sync_schema
+from app.db.session import engine
+from app.main import app
+from app.services import runner
+from app.services.ai_engine import AIEngine
+from app.services.executor import optimizer_executor
+from app.services.jobs import job_queue
+from app.services.progress import progress_hub
+from app.worker import Worker
+from benchmarks.common import percentiles, write_results
+from benchmarks.fake_clerk import FakeClerkIssuer
+from benchmarks.fake_llm import FakeChatModel
+
+POLL_INTERVAL = 0.05
+PROJECT_TIMEOUT = 120
+
+
+async def setup(llm_latency: float):
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    async with engine.begin() as conn:
+        await conn.run_sync(sync_schema)
+
+    redis_client = fakeredis.aioredis.FakeRedis()
+    cache.redis = job_queue.redis = progress_hub.redis = redis_client
+
+    issuer = FakeClerkIssuer("https://clerk.bench.local")
+    settings.CLERK_ISSUER = issuer.issuer
+    security.jwks_store = issuer.key_store()
+
+    llm = FakeChatModel(latency=llm_latency, calls=[])
+    runner.ai_engine = AIEngine(llm=llm, llm_search=llm)
+    return issuer, llm
+
+
+async def user_session(client, token, user_index, projects, samples):
+    headers = {"Authorization": f"Bearer {token}"}
+    for n in range(projects):
+        body = {
+            "title": f"Bench {user_index}-{n}",
+            # Distinct plots: every project pays for its own (fake) LLM calls
+            "plot": f"Story {user_index}-{n}: a crew of misfits plans one last heist in Marseille.",
+            "budget": 50_000_000,
+            "industry": "Hollywood",
+        }
+        started = time.perf_counter()
+        res = await client.post("/api/projects/run", json=body, headers=headers)
+        samples["run"].append(time.perf_counter() - started)
+        res.raise_for_status()
+        project_id = res.json()["id"]
+
+        while True:
+            if time.perf_counter() - started > PROJECT_TIMEOUT:
+                samples["timeouts"] += 1
+                break
+            await asyncio.sleep(POLL_INTERVAL)
+            poll_start = time.perf_counter()
+            res = await client.get(f"/api/projects/{project_id}", headers=headers)
+            samples["poll"].append(time.perf_counter() - poll_start)
+            status = res.json()["status"]
+            if status in ("completed", "failed"):
+                samples["end_to_end"].append(time.perf_counter() - started)
+                samples[status] += 1
+                break
+
+        list_start = time.perf_counter()
+        await client.get("/api/projects/", headers=headers)
+        samples["list"].append(time.perf_counter() - list_start)
+
+
+async def what_if_session(client, issuer, repeat):
+    """
+    Completes one project, then re-optimizes it `repeat` times at different budgets
+    through the endpoint. The first call is reported on its own: it is the one a
+    user waits for after opening a project in a fresh API process.
+    """
+    token = issuer.mint(sub="user_bench_what_if")
+    headers = {"Authorization": f"Bearer {token}"}
+    samples = {"run": [], "poll": [], "list": [], "end_to_end": [], "completed": 0, "failed": 0, "timeouts": 0}
+    await user_session(client, token, "what-if", 1, samples)
+    res = await client.get("/api/projects/", headers=headers)
+    project_id = res.json()[0]["id"]
+
+    durations = []
+    for n in range(repeat):
+        started = time.perf_counter()
+        res = await client.post(f"/api/projects/{project_id}/reoptimize",
+                                json={"budget": 50_000_000 * (0.5 + n / repeat)}, headers=headers)
+        durations.append(time.perf_counter() - started)
+        res.raise_for_status()
+    return {"first_ms": durations[0] * 1000, "rest": percentiles(durations[1:])}
+
+
+async def run_level(client, issuer, concurrency, projects):
+    samples = {"run": [], "poll": [], "list": [], "end_to_end": [], "completed": 0, "failed": 0, "timeouts": 0}
+    tokens = [issuer.mint(sub=f"user_bench_{concurrency}_{u}") for u in range(concurrency)]
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        user_session(client, tokens[u], u, projects, samples) for u in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "projects": concurrency * projects,
+        "completed": samples["completed"],
+        "failed": samples["failed"],
+        "timeouts": samples["timeouts"],
+        "elapsed_s": elapsed,
+        "projects_per_s": samples["completed"] / elapsed if elapsed else 0.0,
+        **{name: percentiles(samples[name]) for name in ("run", "poll", "list", "end_to_end")},
+    }
+
+
+async def main(levels, projects, llm_latency, worker_concurrency, what_if_repeat):
+    issuer, llm = await setup(llm_latency)
+    worker = Worker(job_queue, worker_concurrency)
+    worker_task = asyncio.create_task(worker.run())
+
+    results = {"llm_latency_s": llm_latency, "worker_concurrency": worker_concurrency, "levels": []}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm-up (optimizer process pool spawn, first imports) is not recorded
+        await run_level(client, issuer, 1, 1)
+        for concurrency in levels:
+            level = await run_level(client, issuer, concurrency, projects)
+            results["levels"].append(level)
+            print(f"c={concurrency:>3}: {level['completed']}/{level['projects']} done, "
+                  f"{level['projects_per_s']:.2f} projects/s, run p95={level['run']['p95_ms']:.1f} ms, "
+                  f"poll p95={level['poll']['p95_ms']:.1f} ms, e2e p50={level['end_to_end'].get('p50_ms', 0):.0f} ms")
+        what_if = await what_if_session(client, issuer, what_if_repeat)
+        results["what_if"] = what_if
+        print(f"what-if: first {what_if['first_ms']:.1f} ms, then p50={what_if['rest']['p50_ms']:.1f} ms "
+              f"p95={what_if['rest']['p95_ms']:.1f} ms")
+    results["llm_calls"] = len(llm.calls)
+
+    worker.stop()
+    await worker_task
+    await progress_hub.close()
+    await security.jwks_store.close()
+    await optimizer_executor.shutdown()
+    await engine.dispose()
+    write_results("api", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--projects", type=int, default=3, help="Projects per simulated user")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--worker-concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--what-if-repeat", type=int, default=20, help="Re-optimizations of one completed project")
+    args = parser.parse_args()
+    asyncio.run(main(args.levels, args.projects, args.llm_latency, args.worker_concurrency, args.what_if_repeat))
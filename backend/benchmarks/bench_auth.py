@@ -0,0 +1,51 @@
+"""
+Per-request cost of the get_current_user dependency with and without the
+verified-token cache. Runs offline against FakeClerkIssuer.
+
+Run from backend/:  python -m benchmarks.bench_auth
+"""
+import asyncio
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import security
+from app.core.config import settings
+from app.core.token_cache import token_cache
+from benchmarks.common import percentiles, write_results
+from benchmarks.fake_clerk import FakeClerkIssuer
+
+REQUESTS = 2000
+
+
+async def measure(credentials, cache_size):
+    token_cache.clear()
+    token_cache.max_size = cache_size
+    durations = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        await security.get_current_user(credentials)
+        durations.append(time.perf_counter() - start)
+    return percentiles(durations)
+
+
+async def main():
+    issuer = FakeClerkIssuer(settings.CLERK_ISSUER or "https://clerk.bench.local")
+    settings.CLERK_ISSUER = issuer.issuer
+    security.jwks_store = issuer.key_store()
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=issuer.mint())
+
+    results = {
+        "uncached": await measure(credentials, cache_size=0),
+        "cached": await measure(credentials, cache_size=10000),
+        "token_cache": token_cache.stats(),
+        "jwks_fetches": issuer.jwks_requests,
+    }
+    for name in ("uncached", "cached"):
+        print(f"{name:>9}: p50={results[name]['p50_ms'] * 1000:8.1f} us  p99={results[name]['p99_ms'] * 1000:8.1f} us")
+    await security.jwks_store.close()
+    write_results("auth", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
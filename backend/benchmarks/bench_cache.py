@@ -0,0 +1,80 @@
+"""
+CacheService costs per tier: in-process (L1) hits, Redis (L2) hits, misses,
+batched mget vs sequential gets, and value encoding with compression.
+Redis is fakeredis, so L2 numbers are a lower bound (no network).
+
+Run from backend/:  python -m benchmarks.bench_cache
+Requires fakeredis (benchmarks/requirements.txt).
+"""
+import asyncio
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+
+import fakeredis
+
+from app.core.cache import cache, decode_value, encode_value
+from benchmarks.common import make_casting_data, percentiles, timed, write_results
+
+REPEAT = 2000
+BATCH = 10
+
+
+async def measure(fn, repeat=REPEAT):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        durations.append(time.perf_counter() - start)
+    return percentiles(durations)
+
+
+async def main():
+    cache.redis = fakeredis.aioredis.FakeRedis()
+    actors = make_casting_data(1, actors_per_role=5)["characters"][0]["actors"]
+    keys = [f"actors:bench{i}" for i in range(BATCH)]
+    await cache.mset({key: actors for key in keys}, expire=3600)
+
+    results = {}
+    results["l1_get"] = await measure(lambda: cache.get(keys[0]))
+
+    async def l2_get():
+        cache.local.delete(keys[0])
+        await cache.get(keys[0])
+    results["l2_get"] = await measure(l2_get)
+    results["miss"] = await measure(lambda: cache.get("actors:missing"))
+
+    async def sequential_gets():
+        cache.local.clear()
+        for key in keys:
+            await cache.get(key)
+
+    async def batched_mget():
+        cache.local.clear()
+        await cache.mget(keys)
+    results[f"l2_get_x{BATCH}"] = await measure(sequential_gets, REPEAT // 10)
+    results[f"l2_mget_x{BATCH}"] = await measure(batched_mget, REPEAT // 10)
+
+    results["encoding"] = {}
+    for label, value in (("actor_list", actors), ("project", make_casting_data(30))):
+        encoded, enc = timed(encode_value, value, cache.compress_threshold, repeat=REPEAT // 4)
+        _, dec = timed(decode_value, encoded, repeat=REPEAT // 4)
+        raw, _ = timed(encode_value, value, 0)
+        results["encoding"][label] = {
+            "raw_bytes": len(raw), "stored_bytes": len(encoded),
+            "encode": percentiles(enc), "decode": percentiles(dec),
+        }
+
+    for name, stats in results.items():
+        if "p50_ms" in stats:
+            print(f"{name:>14}: p50={stats['p50_ms'] * 1000:8.1f} us  p99={stats['p99_ms'] * 1000:8.1f} us")
+    for label, stats in results["encoding"].items():
+        print(f"{label:>14}: {stats['raw_bytes']} -> {stats['stored_bytes']} bytes, "
+              f"decode p50={stats['decode']['p50_ms'] * 1000:.1f} us")
+    results["stats"] = cache.snapshot()
+    write_results("cache", results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
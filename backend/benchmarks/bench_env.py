@@ -0,0 +1,42 @@
+"""
+Measures CastingEnv stepping and batched evaluate() throughput.
+
+Run from backend/:  python -m benchmarks.bench_env
+"""
+import time
+
+import numpy as np
+
+from app.services.rl_optimizer import CastingEnv
+from benchmarks.common import make_casting_data, write_results
+
+
+def main():
+    rows = []
+    rng = np.random.default_rng(0)
+    for num_roles in (4, 8, 16, 32):
+        data = make_casting_data(num_roles, 5, seed=num_roles)
+        env = CastingEnv(data, budget_cap=num_roles * 5_000_000)
+
+        episodes = 2000
+        start = time.perf_counter()
+        for _ in range(episodes):
+            env.reset()
+            done = False
+            while not done:
+                _, _, done, _, _ = env.step(rng.integers(0, env.actors_per_char))
+        step_time = (time.perf_counter() - start) / (episodes * num_roles)
+
+        casts = rng.integers(0, env.actors_per_char, size=(100_000, num_roles))
+        start = time.perf_counter()
+        env.evaluate(casts)
+        eval_time = (time.perf_counter() - start) / len(casts)
+
+        rows.append({"roles": num_roles, "step_us": step_time * 1e6, "evaluate_us_per_cast": eval_time * 1e6})
+        print(f"{num_roles:>3} roles: step {step_time * 1e6:6.2f} us | evaluate {eval_time * 1e6:6.3f} us/cast")
+
+    write_results("env", {"runs": rows})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Compares the exact casting solver against the legacy PPO path, and times
+frontier mode (top-K casts plus the salary / box office / risk Pareto front)
+up to dozens of roles.
+
+Run from backend/:  python -m benchmarks.bench_optimizer [--skip-ppo]
+"""
+import argparse
+import itertools
+
+import numpy as np
+
+from app.services.cast_solver import ScoreWeights, build_feature_tensor, pareto_front, score_selection, solve_exact
+from benchmarks.common import make_casting_data, percentiles, timed, write_results
+
+SIZES = [(3, 5), (6, 5), (8, 5), (12, 5), (20, 5)]
+FRONTIER_SIZES = [(24, 5), (36, 6), (48, 8)]
+
+
+def brute_force_scores(features, mask, budget_cap):
+    counts = np.maximum(mask.sum(axis=1), 1)
+    combos = np.array(list(itertools.product(*(range(k) for k in counts))))
+    return combos, np.array([score_selection(features, combo, budget_cap) for combo in combos])
+
+
+def brute_force_front(features, combos):
+    """
+    (salary, box office, risk) totals of every non-dominated cast, by pairwise comparison.
+    """
+    points = features[np.arange(combos.shape[1])[None, :], combos][:, :, [0, 1, 4]].sum(axis=1)
+    points = np.unique(points * [1, -1, 1], axis=0)
+    front = [p for p in points if not ((points <= p).all(axis=1) & (points < p).any(axis=1)).any()]
+    return {tuple(np.round(np.array(p) * [1, -1, 1], 4)) for p in front}
+
+
+def cast_score(casting_data, cast, budget_cap):
+    """
+    Re-scores an optimization_result list through the shared reward.
+    """
+    features, _ = build_feature_tensor(casting_data['characters'])
+    indices = []
+    for char, row in zip(casting_data['characters'], cast):
+        names = [a['name'] for a in char['actors']]
+        indices.append(names.index(row['actor_name']) if row['actor_name'] in names else 0)
+    return score_selection(features, np.array(indices), budget_cap)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skip-ppo", action="store_true", help="Only benchmark the exact solver")
+    parser.add_argument("--seeds", type=int, default=3)
+    args = parser.parse_args()
+
+    from app.services.rl_optimizer import run_optimization
+    from app.services.optimizer import apply_constraints, run_frontier_optimization, run_what_if
+    if not args.skip_ppo:
+        from app.services.rl_optimizer import run_ppo_optimization
+
+    rows = []
+    for num_roles, actors_per_role in SIZES:
+        for seed in range(args.seeds):
+            data = make_casting_data(num_roles, actors_per_role, seed=seed)
+            budget_cap = num_roles * 5_000_000
+            features, mask = build_feature_tensor(data['characters'])
+
+            solution, exact_times = timed(solve_exact, features, mask, budget_cap, repeat=5)
+            row = {
+                "roles": num_roles,
+                "actors_per_role": actors_per_role,
+                "seed": seed,
+                "exact_score": solution.score,
+                "exact_optimal": solution.optimal,
+                "exact_nodes": solution.nodes,
+                "exact_latency": percentiles(exact_times),
+            }
+
+            # Full entry point the worker calls: feature building, solve and result rows
+            _, entry_times = timed(run_optimization, data, budget_cap, repeat=5)
+            row["run_optimization_latency"] = percentiles(entry_times)
+
+            # What-if re-optimization: half the budget, first role locked to its last candidate, risk-averse weights
+            locked = {data['characters'][0]['name']: data['characters'][0]['actors'][-1]['name']}
+            narrowed = apply_constraints(data['characters'], locked=locked)
+            _, what_if_times = timed(run_what_if, narrowed, budget_cap / 2, ScoreWeights(risk=3.0), repeat=5)
+            row["what_if_latency"] = percentiles(what_if_times)
+
+            frontier, frontier_times = timed(run_frontier_optimization, data, budget_cap, repeat=3)
+            row["frontier_latency"] = percentiles(frontier_times)
+            row["pareto_points"] = len(pareto_front(features, mask)[0])
+
+            if actors_per_role ** num_roles <= 50_000:
+                combos, scores = brute_force_scores(features, mask, budget_cap)
+                row["brute_force_score"] = float(scores.max())
+                assert abs(row["brute_force_score"] - solution.score) < 1e-6, "exact solver missed the optimum"
+                top = np.sort(scores)[::-1][:len(frontier["top_k"])]
+                assert np.allclose([alt["score"] for alt in frontier["top_k"]], top), "top-K casts are not the K best"
+                totals, _, exact = pareto_front(features, mask)
+                assert exact and {tuple(np.round(t, 4)) for t in totals} == brute_force_front(features, combos), \
+                    "Pareto front differs from brute force"
+
+            if not args.skip_ppo:
+                cast, ppo_times = timed(run_ppo_optimization, data, budget_cap)
+                row["ppo_score"] = cast_score(data, cast, budget_cap)
+                row["ppo_latency"] = percentiles(ppo_times)
+
+            rows.append(row)
+            line = f"{num_roles:>3} roles seed={seed}: exact={solution.score:10.2f} in {row['exact_latency']['p50_ms']:8.2f} ms"
+            line += f", what-if {row['what_if_latency']['p50_ms']:8.2f} ms, frontier {row['frontier_latency']['p50_ms']:8.2f} ms"
+            if "ppo_score" in row:
+                line += f" | ppo={row['ppo_score']:10.2f} in {row['ppo_latency']['p50_ms']:8.0f} ms"
+            print(line)
+
+    # Frontier mode at scale: top-K branch-and-bound and the (thinned) Pareto front
+    scale_rows = []
+    for num_roles, actors_per_role in FRONTIER_SIZES:
+        data = make_casting_data(num_roles, actors_per_role, seed=0)
+        budget_cap = num_roles * 5_000_000
+        frontier, frontier_times = timed(run_frontier_optimization, data, budget_cap, repeat=3)
+        scale_rows.append({
+            "roles": num_roles,
+            "actors_per_role": actors_per_role,
+            "frontier_latency": percentiles(frontier_times),
+            "top_k_optimal": frontier["optimal"],
+            "pareto_points": len(frontier["pareto"]),
+            "pareto_exact": frontier["pareto_exact"],
+        })
+        print(f"{num_roles:>3} roles x {actors_per_role}: frontier in {percentiles(frontier_times)['p50_ms']:8.1f} ms, "
+              f"top-K optimal={frontier['optimal']}, pareto exact={frontier['pareto_exact']}")
+
+    write_results("optimizer", {"runs": rows, "frontier_scale": scale_rows})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Micro-benchmarks extract_json_from_text on the shapes Gemini actually returns:
+bare JSON, markdown-fenced JSON and JSON wrapped in conversational filler.
+
+Run from backend/:  python -m benchmarks.bench_parsing
+"""
+import json
+import os
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+
+from app.services.ai_engine import extract_json_from_text
+from benchmarks.common import percentiles, timed, write_results
+
+REPEAT = 2000
+
+
+def actor_list(count):
+    return [
+        {"name": f"Actor {i}", "salary": 1_000_000 + i, "box_office": 20_000_000 + i,
+         "rating": 7.5, "versatility": 60, "risk": 0.2}
+        for i in range(count)
+    ]
+
+
+def cases():
+    small = json.dumps(actor_list(5))
+    large = json.dumps({"characters": [{"name": f"Role {i}", "actors": actor_list(5)} for i in range(40)]})
+    return {
+        "bare_small": small,
+        "fenced_small": f"```json\n{small}\n```",
+        "filler_small": f"Sure! Here are five actors that fit the role:\n{small}\nLet me know if you need more.",
+        "bare_large": large,
+        "filler_large": f"Here is the breakdown you asked for.\n```json\n{large}\n```\nHope this helps!",
+        "garbage": "I could not find any actors matching this description." * 20,
+    }
+
+
+def main():
+    results = {}
+    for name, text in cases().items():
+        parsed, durations = timed(extract_json_from_text, text, repeat=REPEAT)
+        results[name] = {"chars": len(text), "parsed": parsed is not None, **percentiles(durations)}
+        print(f"{name:>13}: {len(text):7d} chars  p50={results[name]['p50_ms'] * 1000:8.1f} us  p99={results[name]['p99_ms'] * 1000:8.1f} us")
+    write_results("parsing", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Fires N concurrent identical pipelines against a fake LLM and checks that
+every distinct LLM request is made exactly once (single-flight coalescing).
+
+Run from backend/:  python -m benchmarks.bench_singleflight [--pipelines 20]
+Requires fakeredis (benchmarks/requirements.txt).
+"""
+import argparse
+import asyncio
+import collections
+import time
+
+import fakeredis
+
+from app.core.cache import cache
+from app.services.actor_catalog import ActorCatalog
+from app.services.ai_engine import AIEngine
+from benchmarks.common import write_results
+from benchmarks.fake_llm import FakeChatModel
+
+
+async def main(pipelines: int):
+    cache.redis = fakeredis.aioredis.FakeRedis()
+    llm = FakeChatModel(latency=0.2, calls=[])
+    # Catalog disabled: every role must go through the (coalesced) LLM search
+    engine = AIEngine(llm=llm, llm_search=llm, catalog=ActorCatalog(None, min_candidates=0, max_age=0))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        engine.run_pipeline("A detective hunts a killer in a rain-soaked city.", 20_000_000, "Hollywood")
+        for _ in range(pipelines)
+    ))
+    elapsed = time.perf_counter() - start
+
+    per_prompt = collections.Counter(llm.calls)
+    duplicates = {p[:60]: n for p, n in per_prompt.items() if n > 1}
+    payload = {
+        "pipelines": pipelines,
+        "llm_calls": len(llm.calls),
+        "distinct_requests": len(per_prompt),
+        "duplicates": duplicates,
+        "elapsed_s": elapsed,
+    }
+    print(f"{pipelines} pipelines -> {len(llm.calls)} LLM calls for {len(per_prompt)} distinct requests in {elapsed:.2f}s")
+    write_results("singleflight", payload)
+
+    assert all(r == results[0] for r in results), "pipelines returned different results"
+    assert not duplicates, f"duplicate LLM calls: {duplicates}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pipelines", type=int, default=20)
+    asyncio.run(main(parser.parse_args().pipelines))
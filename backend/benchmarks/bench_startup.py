@@ -0,0 +1,93 @@
+"""
+Cold-start cost of each entry point: import time, peak RSS and which heavy
+ML/LLM packages got loaded, each measured in a fresh interpreter.
+
+- api:    import app.main (what uvicorn loads)
+- worker: import app.worker + get_ai_engine() (what a worker does before its first job)
+
+Fails (exit 1) when the API loads any of HEAVY_MODULES or exceeds the
+--max-api-import-s / --max-api-rss-mb budgets, so regressions are caught.
+
+Run from backend/:  python -m benchmarks.bench_startup [--runs 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import write_results
+
+# Only workers (and OPTIMIZER_MODE=ppo jobs) should ever import these
+HEAVY_MODULES = ["torch", "stable_baselines3", "gymnasium", "langchain_google_genai", "langchain_core"]
+
+PROBES = {
+    "api": "import app.main",
+    "worker": "import app.worker\nfrom app.services.runner import get_ai_engine\nget_ai_engine()",
+}
+
+_PROBE_TEMPLATE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_s": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def probe(code: str):
+    env = {
+        **os.environ,
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "offline"),
+        "DATABASE_URL": os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///:memory:"),
+    }
+    script = _PROBE_TEMPLATE.format(code=code, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int, max_api_import_s: float, max_api_rss_mb: float):
+    results = {}
+    for name, code in PROBES.items():
+        samples = [probe(code) for _ in range(runs)]
+        results[name] = {
+            "import_s_median": statistics.median(s["import_s"] for s in samples),
+            "import_s_max": max(s["import_s"] for s in samples),
+            "rss_mb_max": max(s["rss_mb"] for s in samples),
+            "modules": samples[-1]["modules"],
+            "heavy_modules": samples[-1]["heavy"],
+        }
+        r = results[name]
+        print(f"{name:>7}: import {r['import_s_median']:.2f}s (median of {runs}), "
+              f"RSS {r['rss_mb_max']:.0f} MB, heavy: {', '.join(r['heavy_modules']) or 'none'}")
+
+    api = results["api"]
+    violations = []
+    if api["heavy_modules"]:
+        violations.append(f"API imports {', '.join(api['heavy_modules'])}")
+    if api["import_s_median"] > max_api_import_s:
+        violations.append(f"API import {api['import_s_median']:.2f}s > {max_api_import_s}s")
+    if api["rss_mb_max"] > max_api_rss_mb:
+        violations.append(f"API RSS {api['rss_mb_max']:.0f} MB > {max_api_rss_mb} MB")
+    results["budgets"] = {"max_api_import_s": max_api_import_s, "max_api_rss_mb": max_api_rss_mb}
+    results["violations"] = violations
+    write_results("startup", results)
+
+    if violations:
+        print(f"❌ Cold-start budget exceeded: {'; '.join(violations)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-api-import-s", type=float, default=3.0)
+    parser.add_argument("--max-api-rss-mb", type=float, default=200.0)
+    args = parser.parse_args()
+    main(args.runs, args.max_api_import_s, args.max_api_rss_mb)
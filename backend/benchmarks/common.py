@@ -0,0 +1,82 @@
+import json
+import os
+import random
+import statistics
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentiles(samples):
+    """
+    Summarises latency samples (seconds) as milliseconds.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def timed(fn, *args, repeat=1, **kwargs):
+    """
+    Runs fn `repeat` times, returning (last_result, list_of_durations).
+    """
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        durations.append(time.perf_counter() - start)
+    return result, durations
+
+
+def write_results(name, payload):
+    """
+    Writes a machine-readable result file to benchmarks/results/<name>.json.
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+    print(f"📄 Results written to {path}")
+    return path
+
+
+def make_casting_data(num_roles, actors_per_role=5, seed=0, budget_per_role=5_000_000):
+    """
+    Deterministic synthetic pipeline output shaped like AIEngine.run_pipeline().
+    """
+    rng = random.Random(seed)
+    characters = []
+    for r in range(num_roles):
+        actors = []
+        for a in range(actors_per_role):
+            salary = rng.uniform(0.3, 2.0) * budget_per_role
+            actors.append({
+                "name": f"Actor {r}-{a}",
+                "salary": int(salary),
+                "box_office": int(salary * rng.uniform(5, 40)),
+                "rating": round(rng.uniform(5.0, 9.5), 1),
+                "versatility": rng.randint(30, 100),
+                "risk": round(rng.uniform(0.0, 0.8), 2),
+            })
+        characters.append({
+            "name": f"Role {r}",
+            "gender": rng.choice(["Male", "Female"]),
+            "traits": "synthetic",
+            "budget_min_display": budget_per_role * 0.5,
+            "budget_max_display": budget_per_role * 1.5,
+            "actors": actors,
+        })
+    return {"characters": characters}
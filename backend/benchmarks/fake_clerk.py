@@ -0,0 +1,41 @@
+import json
+import time
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from app.core.jwks import JWKSKeyStore
+
+
+class FakeClerkIssuer:
+    """
+    Offline stand-in for Clerk: signs RS256 tokens and serves the matching JWKS
+    through an in-process httpx transport (no sockets involved).
+    """
+
+    def __init__(self, issuer: str, kid: str = "bench-key"):
+        self.issuer = issuer
+        self.kid = kid
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.jwks_requests = 0
+
+    @property
+    def jwks(self):
+        jwk = json.loads(RSAAlgorithm.to_jwk(self.private_key.public_key()))
+        jwk.update({"kid": self.kid, "alg": "RS256", "use": "sig"})
+        return {"keys": [jwk]}
+
+    def mint(self, sub: str = "user_bench", ttl: int = 3600, **claims):
+        now = int(time.time())
+        payload = {"sub": sub, "iss": self.issuer, "iat": now, "exp": now + ttl, **claims}
+        return jwt.encode(payload, self.private_key, algorithm="RS256", headers={"kid": self.kid})
+
+    def _handle(self, request):
+        self.jwks_requests += 1
+        return httpx.Response(200, json=self.jwks)
+
+    def key_store(self) -> JWKSKeyStore:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+        return JWKSKeyStore(f"{self.issuer}/.well-known/jwks.json", client=client)
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import json
+import re
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+def _seed(text: str) -> int:
+    return int(hashlib.sha1(text.encode()).hexdigest()[:8], 16)
+
+
+def _number(pattern, text, default=0.0):
+    match = re.search(pattern, text)
+    if not match:
+        return default
+    try:
+        return float(match.group(1).replace(",", ""))
+    except ValueError:
+        return default
+
+
+def _actors(role: str, count: int = 5):
+    """
+    Actors for one casting prompt (or one role line of a batched prompt), priced inside its salary range.
+    """
+    low = _number(r"Target Salary Range:\*\* ([\d.e+]+)", role, 1_000_000)
+    high = _number(r"Target Salary Range:\*\* [\d.e+]+ - ([\d.e+]+)", role, 2_000_000)
+    actors = []
+    for i in range(count):
+        s = _seed(f"{role}|{i}")
+        salary = int(low + (high - low) * ((s % 1000) / 999))
+        actors.append({
+            "name": f"Actor {s % 100000}", "salary": salary,
+            "box_office": salary * (5 + s % 30), "rating": round(5 + (s % 45) / 10, 1),
+            "versatility": 30 + s % 70, "risk": round((s % 80) / 100, 2),
+        })
+    return actors
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic offline stand-in for Gemini. Recognises the three AIEngine
+    prompts (extraction, allocation, actor search) and answers with JSON derived
+    from a hash of the prompt, after `latency` seconds plus `latency_per_kchar`
+    per 1000 response characters. Streaming spreads the same latency over
+    `chunk_size`-character chunks. `roles` fixes the number of extracted
+    characters (0 derives it from the plot). Prompt and response sizes are
+    summed in `prompt_chars` / `response_chars`.
+    """
+
+    latency: float = 0.0
+    latency_per_kchar: float = 0.0
+    chunk_size: int = 64
+    roles: int = 0
+    calls: List[str] = []
+    prompt_chars: int = 0
+    response_chars: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-castos"
+
+    def respond(self, prompt: str) -> str:
+        seed = _seed(prompt)
+        if "Extract main characters" in prompt:
+            count = self.roles or 3 + seed % 4
+            return json.dumps({"characters": [
+                {"name": f"Character {i + 1}", "gender": "Male" if (seed >> i) & 1 else "Female",
+                 "age_range": f"{20 + (seed >> (i + 2)) % 40}s", "traits": f"trait-{(seed >> i) % 7}, bold"}
+                for i in range(count)
+            ]})
+
+        if "Movie Producer" in prompt:
+            budget = _number(r"Total Budget is \D*([\d.,]+)", prompt, 10_000_000)
+            names = re.findall(r"'([^']+)'", prompt.split("these characters:", 1)[-1].split("based on", 1)[0])
+            share = budget / max(len(names), 1)
+            return json.dumps({"allocations": [
+                {"name": n, "min_budget": share * 0.5, "max_budget": share * 1.5} for n in names
+            ]})
+
+        if "Casting Director" in prompt and "Roles:" in prompt:
+            lines = re.findall(r"^(\d+)\. (.*)$", prompt.split("Roles:", 1)[1], re.MULTILINE)
+            return json.dumps({"roles": [
+                {"role": int(n), "actors": _actors(line)} for n, line in lines
+            ]})
+
+        if "Casting Director" in prompt:
+            return json.dumps(_actors(prompt))
+
+        return "{}"
+
+    def _record(self, prompt: str) -> str:
+        text = self.respond(prompt)
+        self.calls.append(prompt)
+        self.prompt_chars += len(prompt)
+        self.response_chars += len(text)
+        return text
+
+    def _delay(self, text: str) -> float:
+        return self.latency + self.latency_per_kchar * len(text) / 1000
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._record(prompt)))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        result = self._generate(messages, stop=stop, **kwargs)
+        delay = self._delay(result.generations[0].message.content)
+        if delay:
+            await asyncio.sleep(delay)
+        return result
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        text = self._record("\n".join(str(m.content) for m in messages))
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        delay = self._delay(text)
+        for chunk in chunks:
+            if delay:
+                await asyncio.sleep(delay / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
@@ -0,0 +1,57 @@
+"""
+Runs the whole offline benchmark suite, each benchmark in its own process,
+and collects their result files into benchmarks/results/summary.json.
+
+Run from backend/:  python -m benchmarks.run_all [--quick]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import RESULTS_DIR, write_results
+
+# (module, result file, extra args for --quick)
+SUITE = [
+    ("bench_startup", "startup", ["--runs", "1"]),
+    ("bench_parsing", "parsing", []),
+    ("bench_cache", "cache", []),
+    ("bench_env", "env", []),
+    ("bench_optimizer", "optimizer", ["--skip-ppo", "--seeds", "1"]),
+    ("bench_auth", "auth", []),
+    ("bench_singleflight", "singleflight", []),
+    ("bench_actor_batch", "actor_batch", ["--roles", "4", "12", "--repeat", "1"]),
+    ("bench_api", "api", ["--levels", "1", "4", "--projects", "2"]),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads, skips PPO training")
+    args = parser.parse_args()
+
+    env = {**os.environ, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "offline")}
+    summary = {"started_at": time.time(), "benchmarks": {}}
+    for module, result_name, quick_args in SUITE:
+        print(f"\n▶️  {module}")
+        started = time.perf_counter()
+        cmd = [sys.executable, "-m", f"benchmarks.{module}", *(quick_args if args.quick else [])]
+        code = subprocess.call(cmd, env=env)
+        entry = {"exit_code": code, "elapsed_s": time.perf_counter() - started}
+        path = os.path.join(RESULTS_DIR, f"{result_name}.json")
+        if code == 0 and os.path.exists(path):
+            with open(path) as f:
+                entry["results"] = json.load(f)
+        summary["benchmarks"][module] = entry
+
+    write_results("summary", summary)
+    failed = [m for m, e in summary["benchmarks"].items() if e["exit_code"] != 0]
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
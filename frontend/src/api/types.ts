@@ -25,6 +25,26 @@ export interface OptimizationResult {
   risk: number;
 }
 
+// One alternative cast (frontier mode): totals plus one actor name per role, in cast order
+export interface CastAlternative {
+  rank?: number;
+  score?: number;
+  within_budget?: boolean;
+  total_salary: number;
+  total_box_office: number;
+  total_risk: number;
+  actors: (string | null)[];
+}
+
+// optimization_result under OPTIMIZER_MODE=frontier: the best cast plus ranked and Pareto alternatives
+export interface FrontierResult {
+  cast: OptimizationResult[];
+  optimal: boolean;
+  top_k: CastAlternative[];
+  pareto: CastAlternative[];
+  pareto_exact: boolean;
+}
+
 export interface Project {
   id: number;
   title: string;
@@ -33,6 +53,25 @@ export interface Project {
   industry: 'Hollywood' | 'Bollywood';
   status: 'pending' | 'completed' | 'failed';
   raw_characters: { characters: Character[] };
-  optimization_result: OptimizationResult[];
+  optimization_result: OptimizationResult[] | FrontierResult;
+  // Set when the result was shared with an identical earlier submission
+  reused_from?: number | null;
   created_at: string;
-}
\ No newline at end of file
+}
+
+// POST /api/projects/{id}/reoptimize: a new cast from the stored candidates
+export interface ReoptimizeResult {
+  project_id: number;
+  budget_cap: number;
+  optimization_result: OptimizationResult[];
+  total_salary: number;
+  score: number;
+  optimal: boolean;
+  applied: boolean;
+}
+
+// List view: GET /api/projects/ omits the heavy JSON columns
+export type ProjectSummary = Omit<Project, 'raw_characters' | 'optimization_result'>;
+
+export const castOf = (result: Project['optimization_result']): OptimizationResult[] =>
+  Array.isArray(result) ? result : result.cast;
@@ -1,7 +1,7 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { Link } from 'react-router-dom';
 import api from '../api/axios';
-import { Project } from '../api/types';
+import { ProjectSummary } from '../api/types';
 import Loader from '../components/ui/Loader';
 import Button from '../components/ui/Button';
 // FIXED: Removed AlertCircle from imports, added AlertTriangle just in case you want to use it later, or simply keep it clean.
@@ -10,7 +10,11 @@ import { Plus, LayoutDashboard, Film, TrendingUp, Trash2, Clock, AlertTriangle }
 import { motion } from 'framer-motion';
 
 export default function Dashboard() {
-  const [projects, setProjects] = useState<Project[]>([]);
+  const [projects, setProjects] = useState<ProjectSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Once "Load more" has run, the cursor belongs to the oldest loaded page, not to polls
+  const pagedRef = useRef(false);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -19,13 +23,35 @@ export default function Dashboard() {
     return () => clearInterval(interval);
   }, []);
 
+  // Polls the newest page; older pages loaded via "Load more" are kept below it
   const fetchProjects = () => {
     api.get('/api/projects/')
-      .then(res => setProjects(res.data))
+      .then(res => {
+        const firstPage: ProjectSummary[] = res.data;
+        const oldest = firstPage[firstPage.length - 1];
+        setProjects(prev => {
+          const older = oldest ? prev.filter(p => p.created_at < oldest.created_at || (p.created_at === oldest.created_at && p.id < oldest.id)) : [];
+          return [...firstPage, ...older];
+        });
+        if (!pagedRef.current) setNextCursor(res.headers['x-next-cursor'] ?? null);
+      })
       .catch(err => console.error(err))
       .finally(() => setLoading(false));
   };
 
+  const loadMore = () => {
+    if (!nextCursor) return;
+    pagedRef.current = true;
+    setLoadingMore(true);
+    api.get('/api/projects/', { params: { cursor: nextCursor } })
+      .then(res => {
+        setProjects(prev => [...prev, ...res.data.filter((p: ProjectSummary) => !prev.some(q => q.id === p.id))]);
+        setNextCursor(res.headers['x-next-cursor'] ?? null);
+      })
+      .catch(err => console.error(err))
+      .finally(() => setLoadingMore(false));
+  };
+
   const handleDelete = async (e: React.MouseEvent, id: number) => {
     e.preventDefault(); 
     if (!window.confirm("Are you sure you want to delete this project?")) return;
@@ -150,6 +176,14 @@ export default function Dashboard() {
                         ))}
                     </div>
                 )}
+
+                {nextCursor && (
+                    <div className="flex justify-center">
+                        <Button variant="secondary" onClick={loadMore} isLoading={loadingMore} className="rounded-full">
+                            Load more
+                        </Button>
+                    </div>
+                )}
             </div>
         )}
     </div>
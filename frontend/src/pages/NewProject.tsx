@@ -10,7 +10,8 @@ export default function NewProject() {
     title: '',
     plot: '',
     budget: 10000000,
-    industry: 'Hollywood'
+    industry: 'Hollywood',
+    force_fresh: false
   });
 
   const handleSubmit = async (e: React.FormEvent) => {
@@ -119,6 +120,16 @@ export default function NewProject() {
                         </div>
                     </div>
 
+                    <label className="flex items-center gap-3 text-gray-500 text-xs font-mono uppercase cursor-pointer">
+                        <input
+                        type="checkbox"
+                        className="accent-[#E0AA3E]"
+                        checked={form.force_fresh}
+                        onChange={e => setForm({...form, force_fresh: e.target.checked})}
+                        />
+                        Fresh run (ignore identical past scripts)
+                    </label>
+
                     <div className="pt-6 border-t border-white/10">
                         <motion.button 
                             whileHover={{ scale: 1.02 }}
@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import api from '../api/axios';
-import { Project, Character, Actor } from '../api/types';
+import { Project, Character, Actor, ReoptimizeResult, CastAlternative, castOf } from '../api/types';
 import Loader from '../components/ui/Loader';
 import Button from '../components/ui/Button';
 import { Download, ArrowLeft, Users, ChevronDown, ChevronUp } from 'lucide-react'; 
@@ -15,6 +15,10 @@ export default function ProjectResult() {
   const [project, setProject] = useState<Project | null>(null);
   const [loading, setLoading] = useState(true);
   const [expandedRole, setExpandedRole] = useState<string | null>(null);
+  // What-if budget: previews a cast re-optimized from the stored candidates (no new AI run)
+  const [whatIfBudget, setWhatIfBudget] = useState<number | null>(null);
+  const [preview, setPreview] = useState<ReoptimizeResult | null>(null);
+  const [applying, setApplying] = useState(false);
 
   useEffect(() => {
     let isMounted = true;
@@ -35,6 +39,36 @@ export default function ProjectResult() {
     return () => { isMounted = false; };
   }, [id]);
 
+  useEffect(() => {
+    if (whatIfBudget === null) return;
+    let isCurrent = true;
+    const timer = setTimeout(async () => {
+        try {
+            const res = await api.post(`/api/projects/${id}/reoptimize`, { budget: whatIfBudget });
+            if (isCurrent) setPreview(res.data);
+        } catch (e) { console.error(e); }
+    }, 250);
+    return () => { isCurrent = false; clearTimeout(timer); };
+  }, [id, whatIfBudget]);
+
+  const applyWhatIf = async () => {
+    if (!project || whatIfBudget === null) return;
+    setApplying(true);
+    try {
+        const res = await api.post(`/api/projects/${id}/reoptimize`, { budget: whatIfBudget, apply: true });
+        setProject({ ...project, budget_cap: res.data.budget_cap, optimization_result: res.data.optimization_result });
+        setPreview(null);
+        setWhatIfBudget(null);
+    } catch (e) { console.error(e); }
+    finally { setApplying(false); }
+  };
+
+  // Roles where an alternative differs from the shown cast, e.g. "Hero: Jane Doe"
+  const castChanges = (alt: CastAlternative) => alt.actors
+    .map((name, i) => (name && cast[i] && name !== cast[i].actor_name ? `${cast[i].role}: ${name}` : null))
+    .filter(Boolean)
+    .join(', ') || 'Same cast';
+
   const renderTraits = (traits: any) => {
     if (!traits) return 'N/A';
     const traitStr = Array.isArray(traits) ? traits.join(', ') : String(traits);
@@ -51,12 +85,16 @@ export default function ProjectResult() {
   
   if (!project || project.status === 'failed') return <div className="text-danger text-center mt-20 font-mono">Optimization Failed. Please try creating a new project.</div>;
 
-  const totalCost = project.optimization_result.reduce((acc, curr) => acc + curr.salary, 0);
-  const remaining = project.budget_cap - totalCost;
+  const cast = preview ? preview.optimization_result : castOf(project.optimization_result);
+  // Top-K and Pareto alternatives (frontier mode only); hidden while previewing a what-if cast
+  const frontier = preview || Array.isArray(project.optimization_result) ? null : project.optimization_result;
+  const budgetCap = preview ? preview.budget_cap : project.budget_cap;
+  const totalCost = cast.reduce((acc, curr) => acc + curr.salary, 0);
+  const remaining = budgetCap - totalCost;
   const currency = project.industry === 'Bollywood' ? '₹' : '$';
   
-  const costData = project.optimization_result.map(r => ({ name: r.role, value: r.salary }));
-  const ratingData = project.optimization_result.map(r => ({ name: r.actor_name, rating: r.rating }));
+  const costData = cast.map(r => ({ name: r.role, value: r.salary }));
+  const ratingData = cast.map(r => ({ name: r.actor_name, rating: r.rating }));
 
   return (
     <div className="space-y-8 pb-12 relative">
@@ -81,6 +119,27 @@ export default function ProjectResult() {
         </Button>
       </div>
 
+      {/* What-if */}
+      <div className="bg-[#111]/50 backdrop-blur border border-white/10 rounded-xl p-6 flex flex-col md:flex-row md:items-center gap-4">
+          <h3 className="text-sm font-bold text-gray-400 uppercase tracking-wider md:w-40">What-If Budget</h3>
+          <input
+            type="range"
+            className="flex-1 accent-[#E0AA3E]"
+            min={Math.round(project.budget_cap * 0.25)}
+            max={Math.round(project.budget_cap * 2)}
+            step={Math.max(Math.round(project.budget_cap / 100), 1)}
+            value={whatIfBudget ?? project.budget_cap}
+            onChange={e => setWhatIfBudget(Number(e.target.value))}
+          />
+          <span className="font-mono text-white md:w-40 text-right">{currency}{budgetCap.toLocaleString()}</span>
+          {preview && (
+            <div className="flex gap-2">
+                <Button variant="secondary" onClick={() => { setPreview(null); setWhatIfBudget(null); }}>Reset</Button>
+                <Button onClick={applyWhatIf} isLoading={applying}>Apply</Button>
+            </div>
+          )}
+      </div>
+
       {/* Charts */}
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
           <div className="bg-[#111]/50 backdrop-blur border border-white/10 rounded-xl p-6">
@@ -130,6 +189,33 @@ export default function ProjectResult() {
           </div>
       </div>
 
+      {/* Alternatives */}
+      {frontier && (
+        <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
+          {[
+            { title: `Top ${frontier.top_k.length} Casts`, rows: frontier.top_k },
+            { title: `Cost / Box Office / Risk Frontier${frontier.pareto_exact ? '' : ' (approx.)'}`, rows: frontier.pareto },
+          ].map(({ title, rows }) => (
+            <div key={title} className="bg-[#111]/50 backdrop-blur border border-white/10 rounded-xl p-6">
+              <h3 className="text-sm font-bold text-gray-400 uppercase tracking-wider mb-4">{title}</h3>
+              <div className="divide-y divide-white/5 max-h-[360px] overflow-y-auto">
+                {rows.map((alt, idx) => (
+                  <div key={idx} className="py-3 grid grid-cols-12 gap-2 text-sm">
+                    <div className="col-span-1 font-mono text-[#E0AA3E]">{alt.rank ?? idx + 1}</div>
+                    <div className={`col-span-4 font-mono ${alt.within_budget === false ? 'text-[#EF476F]' : 'text-gray-300'}`}>
+                      {currency}{alt.total_salary.toLocaleString()}
+                    </div>
+                    <div className="col-span-4 font-mono text-gray-400">BO {currency}{alt.total_box_office.toLocaleString()}</div>
+                    <div className="col-span-3 font-mono text-gray-500 text-right">RISK {alt.total_risk.toFixed(2)}</div>
+                    <div className="col-span-11 col-start-2 text-xs text-gray-500">{castChanges(alt)}</div>
+                  </div>
+                ))}
+              </div>
+            </div>
+          ))}
+        </div>
+      )}
+
       {/* List */}
       <div className="rounded-xl border border-white/10 bg-[#111]/50 backdrop-blur overflow-hidden">
         <div className="p-6 border-b border-white/10 bg-white/5 flex justify-between items-center">
@@ -140,7 +226,7 @@ export default function ProjectResult() {
         </div>
         
         <div className="divide-y divide-white/5">
-          {project.optimization_result.map((row, idx) => {
+          {cast.map((row, idx) => {
             const charDetails = project.raw_characters?.characters?.find((c: Character) => c.name === row.role);
             const isExpanded = expandedRole === row.role;
 